@@ -0,0 +1,78 @@
+"""Initial schema: users, flashcards, reviews, holidays
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created earlier by Base.metadata.create_all already have these
+tables, so each one is only created when missing.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _existing_tables():
+    # Offline (--sql) runs can't inspect the database, so they emit everything
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    existing = _existing_tables()
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=True),
+        )
+        op.create_index(op.f("ix_users_id"), "users", ["id"])
+        op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+
+    if "flashcards" not in existing:
+        op.create_table(
+            "flashcards",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("question", sa.String(), nullable=True),
+            sa.Column("answer", sa.String(), nullable=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("box", sa.Integer(), nullable=True),
+            sa.Column("last_reviewed", sa.Date(), nullable=True),
+        )
+        op.create_index(op.f("ix_flashcards_id"), "flashcards", ["id"])
+
+    if "reviews" not in existing:
+        op.create_table(
+            "reviews",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("flashcard_id", sa.Integer(), sa.ForeignKey("flashcards.id"), nullable=True),
+            sa.Column("correct", sa.Integer(), nullable=True),
+            sa.Column("timestamp", sa.DateTime(), nullable=True),
+        )
+        op.create_index(op.f("ix_reviews_id"), "reviews", ["id"])
+
+    if "holidays" not in existing:
+        op.create_table(
+            "holidays",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("start_date", sa.Date(), nullable=True),
+            sa.Column("end_date", sa.Date(), nullable=True),
+            sa.Column("skip_catchup", sa.Boolean(), nullable=True),
+        )
+        op.create_index(op.f("ix_holidays_id"), "holidays", ["id"])
+
+
+def downgrade():
+    op.drop_table("holidays")
+    op.drop_table("reviews")
+    op.drop_table("flashcards")
+    op.drop_table("users")
@@ -0,0 +1,64 @@
+"""Ingest job queue and upload dedupe cache
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _existing_tables():
+    # Offline (--sql) runs can't inspect the database, so they emit everything
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    existing = _existing_tables()
+
+    if "ingest_jobs" not in existing:
+        op.create_table(
+            "ingest_jobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("filename", sa.String(), nullable=True),
+            sa.Column("file_path", sa.String(), nullable=True),
+            sa.Column("status", sa.String(), nullable=True),
+            sa.Column("chunks_total", sa.Integer(), nullable=True),
+            sa.Column("chunks_done", sa.Integer(), nullable=True),
+            sa.Column("cards_created", sa.Integer(), nullable=True),
+            sa.Column("llm_cache_hits", sa.Integer(), nullable=True),
+            sa.Column("llm_cache_misses", sa.Integer(), nullable=True),
+            sa.Column("error", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index(op.f("ix_ingest_jobs_id"), "ingest_jobs", ["id"])
+        op.create_index(op.f("ix_ingest_jobs_status"), "ingest_jobs", ["status"])
+
+    if "ingest_cache" not in existing:
+        op.create_table(
+            "ingest_cache",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("content_hash", sa.String(), nullable=True),
+            sa.Column("extracted_text", sa.Text(), nullable=True),
+            sa.Column("qa_pairs", sa.Text(), nullable=True),
+            sa.Column("size_bytes", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("last_used_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index(op.f("ix_ingest_cache_id"), "ingest_cache", ["id"])
+        op.create_index(op.f("ix_ingest_cache_content_hash"), "ingest_cache", ["content_hash"], unique=True)
+        op.create_index(op.f("ix_ingest_cache_last_used_at"), "ingest_cache", ["last_used_at"])
+
+
+def downgrade():
+    op.drop_table("ingest_cache")
+    op.drop_table("ingest_jobs")
@@ -0,0 +1,33 @@
+"""Add flashcards.next_due
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Existing cards are backfilled as due today; their next review puts them
+on the regular box schedule.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _has_next_due():
+    if context.is_offline_mode():
+        return False
+    return "next_due" in {c["name"] for c in sa.inspect(op.get_bind()).get_columns("flashcards")}
+
+
+def upgrade():
+    if not _has_next_due():
+        op.add_column("flashcards", sa.Column("next_due", sa.Date(), nullable=True))
+    op.execute("UPDATE flashcards SET next_due = CURRENT_DATE WHERE next_due IS NULL")
+
+
+def downgrade():
+    with op.batch_alter_table("flashcards") as batch_op:
+        batch_op.drop_column("next_due")
@@ -0,0 +1,40 @@
+"""Composite indexes for the hot per-user queries
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+- flashcards(user_id, next_due): daily/catch-up queues and due counts
+- flashcards(user_id, box): mastered count (and any user_id-only filter)
+- reviews(user_id, timestamp): history and last study date
+- holidays(user_id, start_date, end_date): active holiday lookup
+
+On PostgreSQL the indexes are built CONCURRENTLY, outside a transaction,
+so writes to the live tables are not blocked while they build.
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_flashcards_user_id_next_due", "flashcards", ["user_id", "next_due"]),
+    ("ix_flashcards_user_id_box", "flashcards", ["user_id", "box"]),
+    ("ix_reviews_user_id_timestamp", "reviews", ["user_id", "timestamp"]),
+    ("ix_holidays_user_id_dates", "holidays", ["user_id", "start_date", "end_date"]),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,75 @@
+"""Per-user stats row holding the current study streak
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Backfills the streak from review history: the run of consecutive UTC
+days ending at each user's last study day. The table may already exist
+(empty) when create_all ran first, so the backfill runs whenever it is
+empty.
+"""
+from datetime import timedelta
+
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+reviews = sa.table("reviews", sa.column("user_id", sa.Integer), sa.column("timestamp", sa.DateTime))
+
+
+user_stats = sa.table(
+    "user_stats",
+    sa.column("user_id", sa.Integer),
+    sa.column("current_streak", sa.Integer),
+    sa.column("last_study_date", sa.Date),
+)
+
+
+def _backfill(conn):
+    rows, user_id, last_day, streak = [], None, None, 0
+    result = conn.execute(
+        sa.select(reviews.c.user_id, reviews.c.timestamp)
+        .where(reviews.c.user_id.is_not(None), reviews.c.timestamp.is_not(None))
+        .order_by(reviews.c.user_id, reviews.c.timestamp)
+    )
+    for review_user, timestamp in result:
+        day = timestamp.date()
+        if review_user != user_id:
+            if user_id is not None:
+                rows.append({"user_id": user_id, "current_streak": streak, "last_study_date": last_day})
+            user_id, last_day, streak = review_user, day, 1
+        elif day != last_day:
+            streak = streak + 1 if day - last_day == timedelta(days=1) else 1
+            last_day = day
+    if user_id is not None:
+        rows.append({"user_id": user_id, "current_streak": streak, "last_study_date": last_day})
+    if rows:
+        op.bulk_insert(user_stats, rows)
+
+
+def upgrade():
+    if context.is_offline_mode():
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if "user_stats" not in existing:
+        op.create_table(
+            "user_stats",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("current_streak", sa.Integer(), nullable=True),
+            sa.Column("last_study_date", sa.Date(), nullable=True),
+        )
+    if context.is_offline_mode():
+        return
+    conn = op.get_bind()
+    if conn.execute(sa.select(sa.func.count()).select_from(user_stats)).scalar() == 0:
+        _backfill(conn)
+
+
+def downgrade():
+    op.drop_table("user_stats")
@@ -0,0 +1,50 @@
+"""Per-user card and review counters on user_stats
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+Adds rows for users who have cards but no reviews yet, then fills the
+counters with one correlated count per column (served by the
+flashcards(user_id, box) and reviews(user_id, timestamp) indexes).
+scripts/recompute_stats.py rebuilds the same numbers, streaks included.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ["box1_cards", "box2_cards", "box3_cards", "total_reviews", "correct_reviews"]
+
+
+def upgrade():
+    existing = set()
+    if not context.is_offline_mode():
+        existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("user_stats")}
+    with op.batch_alter_table("user_stats") as batch_op:
+        for name in COLUMNS:
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, sa.Integer(), nullable=True))
+
+    op.execute(
+        "INSERT INTO user_stats (user_id, current_streak) "
+        "SELECT DISTINCT user_id, 0 FROM flashcards "
+        "WHERE user_id IS NOT NULL AND user_id NOT IN (SELECT user_id FROM user_stats)"
+    )
+    op.execute(
+        "UPDATE user_stats SET "
+        "box1_cards = (SELECT count(*) FROM flashcards f WHERE f.user_id = user_stats.user_id AND COALESCE(f.box, 1) = 1), "
+        "box2_cards = (SELECT count(*) FROM flashcards f WHERE f.user_id = user_stats.user_id AND f.box = 2), "
+        "box3_cards = (SELECT count(*) FROM flashcards f WHERE f.user_id = user_stats.user_id AND f.box = 3), "
+        "total_reviews = (SELECT count(*) FROM reviews r WHERE r.user_id = user_stats.user_id), "
+        "correct_reviews = (SELECT COALESCE(sum(r.correct), 0) FROM reviews r WHERE r.user_id = user_stats.user_id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("user_stats") as batch_op:
+        for name in reversed(COLUMNS):
+            batch_op.drop_column(name)
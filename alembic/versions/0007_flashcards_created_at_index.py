@@ -0,0 +1,32 @@
+"""Index for paging through a user's flashcards
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+/flashcards/{user_id} pages on (created_at, id); history pages use the
+existing reviews(user_id, timestamp) index. Built CONCURRENTLY on
+PostgreSQL like 0004.
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_flashcards_user_id_created_at", "flashcards", ["user_id", "created_at"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_flashcards_user_id_created_at", table_name="flashcards",
+            if_exists=True, postgresql_concurrently=True,
+        )
@@ -0,0 +1,42 @@
+"""Stored daily review queues and the user_stats version they are keyed on
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+Existing users start at queue_version 0; queues are built on the first
+/daily/ request, so there is nothing to backfill.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables, columns = set(), set()
+    if not context.is_offline_mode():
+        inspector = sa.inspect(op.get_bind())
+        tables = set(inspector.get_table_names())
+        columns = {c["name"] for c in inspector.get_columns("user_stats")}
+    if "queue_version" not in columns:
+        with op.batch_alter_table("user_stats") as batch_op:
+            batch_op.add_column(sa.Column("queue_version", sa.Integer(), nullable=True, server_default="0"))
+    if "daily_queues" not in tables:
+        op.create_table(
+            "daily_queues",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("day", sa.Date(), nullable=True),
+            sa.Column("version", sa.Integer(), nullable=True),
+            sa.Column("today_ids", sa.Text(), nullable=True),
+            sa.Column("catchup_ids", sa.Text(), nullable=True),
+        )
+
+
+def downgrade():
+    op.drop_table("daily_queues")
+    with op.batch_alter_table("user_stats") as batch_op:
+        batch_op.drop_column("queue_version")
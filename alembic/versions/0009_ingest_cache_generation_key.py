@@ -0,0 +1,30 @@
+"""Generation settings behind cached whole-document results
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+Existing qa_pairs have no key, so they are regenerated (from the cached
+extraction) the next time the same file is uploaded.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = set()
+    if not context.is_offline_mode():
+        columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("ingest_cache")}
+    if "generation_key" not in columns:
+        with op.batch_alter_table("ingest_cache") as batch_op:
+            batch_op.add_column(sa.Column("generation_key", sa.String(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("ingest_cache") as batch_op:
+        batch_op.drop_column("generation_key")
@@ -1,115 +1,452 @@
 # backend/crud.py
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, event, func, insert, literal, select, tuple_, union_all, update
 from . import models, schemas
-from datetime import date, timedelta
+import json
+import random
+from datetime import date, datetime, timedelta
 
-def get_flashcards_by_user(db: Session, user_id: int):
-    return db.query(models.Flashcard).filter(models.Flashcard.user_id == user_id).all()
+# Days until a card in each Leitner box is due again
+BOX_INTERVAL_DAYS = {1: 1, 2: 2, 3: 3}
+MAX_BOX = max(BOX_INTERVAL_DAYS)
+
+# Per-user lookups (active holiday, last study date) are memoized in
+# session.info. The app uses one session per request, so the cache lives
+# for one request. It is dropped whenever the session commits or rolls
+# back, so a write never leaves a stale value behind.
+_MEMO_KEY = "crud_memo"
+
+def _memoized(db: Session, key: tuple, load):
+    memo = db.info.setdefault(_MEMO_KEY, {})
+    if key not in memo:
+        memo[key] = load()
+    return memo[key]
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_memoized(session):
+    session.info.pop(_MEMO_KEY, None)
+
+def get_flashcards_page(db: Session, user_id: int, limit: int, after: tuple = None):
+    """Oldest first, keyset-paginated on (created_at, id).
+
+    Returns up to `limit` cards after the (created_at, id) position `after`,
+    plus whether more follow.
+    """
+    query = db.query(models.Flashcard).filter(models.Flashcard.user_id == user_id)
+    if after:
+        query = query.filter(tuple_(models.Flashcard.created_at, models.Flashcard.id) > tuple_(*after))
+    rows = query.order_by(models.Flashcard.created_at, models.Flashcard.id).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
 
 def create_flashcard(db: Session, flashcard: schemas.FlashcardCreate, user_id: int):
     db_flashcard = models.Flashcard(**flashcard.dict(), user_id=user_id)
     db.add(db_flashcard)
+    stats = _user_stats_for_update(db, user_id)
+    stats.box1_cards += 1
+    _invalidate_daily_queue(stats)
     db.commit()
     db.refresh(db_flashcard)
     return db_flashcard
 
+def create_flashcards(db: Session, flashcards: list[schemas.FlashcardCreate], user_id: int):
+    """Inserts many flashcards in one transaction.
+
+    Uses a single executemany INSERT ... RETURNING and returns the created rows
+    as dicts, so there are no per-row commits or refreshes.
+    """
+    rows = _insert_flashcards(db, flashcards, user_id)
+    db.commit()
+    return rows
+
+def _insert_flashcards(db: Session, flashcards: list[schemas.FlashcardCreate], user_id: int):
+    if not flashcards:
+        return []
+    table = models.Flashcard.__table__
+    stmt = insert(table).returning(
+        table.c.id, table.c.question, table.c.answer, table.c.user_id,
+        table.c.created_at, table.c.box, sort_by_parameter_order=True,
+    )
+    rows = db.execute(stmt, [{**f.dict(), "user_id": user_id} for f in flashcards]).mappings().all()
+    stats = _user_stats_for_update(db, user_id)
+    stats.box1_cards += len(rows)
+    _invalidate_daily_queue(stats)
+    return [dict(row) for row in rows]
+
+_ZERO_STATS = dict(
+    current_streak=0, box1_cards=0, box2_cards=0, box3_cards=0,
+    total_reviews=0, correct_reviews=0, queue_version=0,
+)
+
+def _empty_user_stats(user_id: int):
+    return models.UserStats(user_id=user_id, **_ZERO_STATS)
+
+def get_user_stats(db: Session, user_id: int):
+    """The user's counters; an unsaved all-zero row for users with no activity yet."""
+    stats = db.query(models.UserStats).filter(models.UserStats.user_id == user_id).first()
+    return stats or _empty_user_stats(user_id)
+
+def _dialect_insert(db: Session):
+    # insert() with on_conflict_do_nothing/do_update for the bound database
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert
+
+def _user_stats_for_update(db: Session, user_id: int):
+    """The user's stats row, locked until the caller commits.
+
+    Creates the row first if it is missing (a no-op when it exists), so
+    concurrent first writers don't collide on the primary key. That write
+    also takes SQLite's database write lock, which SQLite has in place of
+    FOR UPDATE; on PostgreSQL the FOR UPDATE row lock does the job. Either
+    way concurrent writers wait here and can't lose increments.
+    """
+    db.execute(_dialect_insert(db)(models.UserStats).values(
+        user_id=user_id, **_ZERO_STATS
+    ).on_conflict_do_nothing(index_elements=["user_id"]))
+    return db.query(models.UserStats).filter(
+        models.UserStats.user_id == user_id
+    ).with_for_update().populate_existing().one()
+
+def _invalidate_daily_queue(stats: models.UserStats):
+    # The stored daily queue and its ETag are keyed on this version
+    stats.queue_version = (stats.queue_version or 0) + 1
+
+def record_study_day(stats: models.UserStats, day: date):
+    """Extends the streak if `day` follows the last study day, restarts it after a gap."""
+    if stats.last_study_date == day:
+        return
+    if stats.last_study_date == day - timedelta(days=1):
+        stats.current_streak = (stats.current_streak or 0) + 1
+    else:
+        stats.current_streak = 1
+    stats.last_study_date = day
+
+def get_dashboard_summary(db: Session, user_id: int):
+    """The user's stats and active holiday (or None), fetched with one query.
+
+    Starts from a one-row select of the user id and outer joins both, so a
+    user with no stats row or no holiday still gets a row back.
+    """
+    today = date.today()
+    user = select(literal(user_id).label("user_id")).subquery()
+    stats, holiday = db.query(models.UserStats, models.Holiday).select_from(user).outerjoin(
+        models.UserStats, models.UserStats.user_id == user.c.user_id
+    ).outerjoin(
+        models.Holiday, and_(
+            models.Holiday.user_id == user.c.user_id,
+            models.Holiday.start_date <= today,
+            models.Holiday.end_date >= today,
+        )
+    ).first()
+    # Later get_active_holiday calls in this request reuse it
+    db.info.setdefault(_MEMO_KEY, {})[("active_holiday", user_id)] = _with_days_left(holiday, today)
+    return stats or _empty_user_stats(user_id), holiday
+
+def _move_box_count(stats: models.UserStats, old_box: int, new_box: int):
+    if old_box != new_box:
+        setattr(stats, f"box{old_box}_cards", getattr(stats, f"box{old_box}_cards") - 1)
+        setattr(stats, f"box{new_box}_cards", getattr(stats, f"box{new_box}_cards") + 1)
+
+def recompute_user_stats(db: Session, user_ids: list[int] = None) -> int:
+    """Rebuilds user_stats from flashcards and reviews; all users when user_ids is None.
+
+    For backfills and repairs; normal writes keep the counters up to date.
+    Returns the number of users written.
+    """
+    def scoped(query, column):
+        return query.filter(column.in_(user_ids)) if user_ids is not None else query
+
+    fresh = {}
+    def stats_for(user_id):
+        if user_id not in fresh:
+            fresh[user_id] = _empty_user_stats(user_id)
+        return fresh[user_id]
+
+    box = func.coalesce(models.Flashcard.box, 1)
+    box_counts = scoped(
+        db.query(models.Flashcard.user_id, box, func.count(models.Flashcard.id)),
+        models.Flashcard.user_id,
+    ).filter(models.Flashcard.user_id.isnot(None)).group_by(models.Flashcard.user_id, box)
+    for user_id, card_box, count in box_counts:
+        setattr(stats_for(user_id), f"box{min(card_box, MAX_BOX)}_cards", count)
+
+    review_counts = scoped(
+        db.query(
+            models.Review.user_id, func.count(models.Review.id),
+            func.coalesce(func.sum(models.Review.correct), 0),
+        ),
+        models.Review.user_id,
+    ).filter(models.Review.user_id.isnot(None)).group_by(models.Review.user_id)
+    for user_id, total, correct in review_counts:
+        stats = stats_for(user_id)
+        stats.total_reviews, stats.correct_reviews = total, correct
+
+    # Replay review days in order to rebuild the streaks
+    review_days = scoped(
+        db.query(models.Review.user_id, models.Review.timestamp), models.Review.user_id
+    ).filter(
+        models.Review.user_id.isnot(None), models.Review.timestamp.isnot(None)
+    ).order_by(models.Review.user_id, models.Review.timestamp).yield_per(10000)
+    for user_id, timestamp in review_days:
+        record_study_day(stats_for(user_id), timestamp.date())
+
+    # Versions only move forward, so clients can't match an ETag from before the rebuild
+    versions = dict(scoped(
+        db.query(models.UserStats.user_id, models.UserStats.queue_version), models.UserStats.user_id
+    ).all())
+    for user_id, stats in fresh.items():
+        stats.queue_version = (versions.get(user_id) or 0) + 1
+
+    scoped(db.query(models.UserStats), models.UserStats.user_id).delete()
+    db.add_all(fresh.values())
+    db.commit()
+    return len(fresh)
+
+def _apply_review(stats: models.UserStats, card, correct: bool, day: date):
+    stats.total_reviews += 1
+    stats.correct_reviews += int(correct)
+    if card:
+        old_box = card.box or 1
+        schedule_card(card, correct, day)
+        _move_box_count(stats, old_box, card.box)
+
 def create_review(db: Session, review: schemas.ReviewCreate):
-    db_review = models.Review(**review.dict())
+    """Records a review, reschedules the card and updates the streak in one transaction."""
+    now = datetime.utcnow()
+    db_review = models.Review(**review.dict(), timestamp=now)
     db.add(db_review)
+    stats = _user_stats_for_update(db, review.user_id)
+    card = db.query(models.Flashcard).filter(
+        models.Flashcard.id == review.flashcard_id, models.Flashcard.user_id == review.user_id
+    ).with_for_update().first()
+    _apply_review(stats, card, review.correct, date.today())
+    record_study_day(stats, now.date())
+    _invalidate_daily_queue(stats)
     db.commit()
     db.refresh(db_review)
     return db_review
 
+def create_reviews(db: Session, user_id: int, reviews: list[schemas.ReviewBase]):
+    """Records a session's reviews in one transaction, in the order given.
+
+    Card boxes are read and locked with one query, the reviews go in as one
+    executemany INSERT, cards are rescheduled with one executemany UPDATE and
+    the stats row is updated once. Raises LookupError listing the flashcard
+    ids the user doesn't own; nothing is written in that case.
+    Returns the new schedule of each reviewed card.
+    """
+    if not reviews:
+        return []
+    # Lock the stats row before reading boxes, so concurrent batches see each other's moves
+    stats = _user_stats_for_update(db, user_id)
+    card_ids = {r.flashcard_id for r in reviews}
+    boxes = dict(db.query(models.Flashcard.id, models.Flashcard.box).filter(
+        models.Flashcard.id.in_(card_ids), models.Flashcard.user_id == user_id
+    ).with_for_update().all())
+    missing = sorted(card_ids - boxes.keys())
+    if missing:
+        db.rollback()
+        raise LookupError(missing)
+
+    now, today = datetime.utcnow(), date.today()
+    for review in reviews:
+        old_box = boxes[review.flashcard_id] or 1
+        boxes[review.flashcard_id] = next_box(old_box, review.correct)
+        _move_box_count(stats, old_box, boxes[review.flashcard_id])
+        stats.total_reviews += 1
+        stats.correct_reviews += int(review.correct)
+    record_study_day(stats, now.date())
+    _invalidate_daily_queue(stats)
+
+    db.execute(insert(models.Review.__table__), [
+        {"user_id": user_id, "flashcard_id": r.flashcard_id, "correct": int(r.correct), "timestamp": now}
+        for r in reviews
+    ])
+    schedule = [
+        {"id": card_id, "box": box, "last_reviewed": today,
+         "next_due": today + timedelta(days=BOX_INTERVAL_DAYS[box])}
+        for card_id, box in boxes.items()
+    ]
+    db.execute(update(models.Flashcard), schedule)
+    db.commit()
+    return schedule
+
 def get_user_history(db: Session, user_id: int):
     return db.query(models.Review).filter(models.Review.user_id == user_id).all()
 
-def get_mastered_count(db: Session, user_id: int):
-    return db.query(models.Flashcard).filter(
-        models.Flashcard.user_id == user_id, models.Flashcard.box == 3
-    ).count()
+def get_progress(db: Session, user_id: int, start: date, end: date, bucket: str = "day"):
+    """Correct/wrong review counts per day or ISO week (Monday start), from start to end inclusive.
 
-def get_daily_cards(db: Session, user_id: int, limit: int = 20):
-    today = date.today()
-    flashcards = db.query(models.Flashcard).filter(models.Flashcard.user_id == user_id).all()
-    
-    eligible = []
-    for card in flashcards:
-        if card.box == 1:
-            eligible.append(card)
-        elif card.box == 2 and today.toordinal() % 2 == 0:
-            eligible.append(card)
-        elif card.box == 3 and today.toordinal() % 3 == 0:
-            eligible.append(card)
-    
-    # Shuffle and limit
-    import random
-    random.shuffle(eligible)
-    return eligible[:limit]
+    Days are grouped in SQL over the (user_id, timestamp) index; weeks are
+    rolled up from those few rows. Buckets without reviews are left out.
+    """
+    day = func.date(models.Review.timestamp)
+    rows = db.query(
+        day, func.count(models.Review.id), func.coalesce(func.sum(models.Review.correct), 0)
+    ).filter(
+        models.Review.user_id == user_id,
+        models.Review.timestamp >= datetime.combine(start, datetime.min.time()),
+        models.Review.timestamp < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+    ).group_by(day).order_by(day).all()
+
+    buckets = {}
+    for review_day, total, correct in rows:
+        key = date.fromisoformat(str(review_day)[:10])  # SQLite returns text, Postgres a date
+        if bucket == "week":
+            key -= timedelta(days=key.weekday())
+        counts = buckets.setdefault(key, [0, 0])
+        counts[0] += total
+        counts[1] += correct
+
+    result = [
+        {"start": key, "total": total, "correct": correct, "wrong": total - correct}
+        for key, (total, correct) in buckets.items()
+    ]
+    total = sum(b["total"] for b in result)
+    correct = sum(b["correct"] for b in result)
+    return {
+        "bucket": bucket, "start": start, "end": end, "buckets": result,
+        "totals": {"total": total, "correct": correct, "wrong": total - correct},
+    }
+
+def get_user_history_page(db: Session, user_id: int, limit: int, before: tuple = None):
+    """Newest first, keyset-paginated on (timestamp, id).
+
+    Returns up to `limit` reviews before the (timestamp, id) position `before`,
+    plus whether more follow.
+    """
+    query = db.query(models.Review).filter(models.Review.user_id == user_id)
+    if before:
+        query = query.filter(tuple_(models.Review.timestamp, models.Review.id) < tuple_(*before))
+    rows = query.order_by(models.Review.timestamp.desc(), models.Review.id.desc()).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+def next_box(box: int, correct: bool) -> int:
+    return min((box or 1) + 1, MAX_BOX) if correct else 1
+
+def schedule_card(card: models.Flashcard, correct: bool, day: date):
+    """Moves a card through the Leitner boxes and sets when it is due next."""
+    card.box = next_box(card.box, correct)
+    card.last_reviewed = day
+    card.next_due = day + timedelta(days=BOX_INTERVAL_DAYS[card.box])
+
+def count_due_cards(db: Session, user_id: int, day: date = None) -> int:
+    return db.query(func.count(models.Flashcard.id)).filter(
+        models.Flashcard.user_id == user_id,
+        models.Flashcard.next_due <= (day or date.today()),
+    ).scalar()
 
 def get_last_study_date(db: Session, user_id: int):
-    last_review = db.query(models.Review).filter(
-        models.Review.user_id == user_id
-    ).order_by(models.Review.timestamp.desc()).first()
-    return last_review.timestamp.date() if last_review else None
+    def load():
+        last = db.query(func.max(models.Review.timestamp)).filter(
+            models.Review.user_id == user_id
+        ).scalar()
+        return last.date() if last else None
+    return _memoized(db, ("last_study_date", user_id), load)
 
 
-def get_catchup_cards(db: Session, user_id: int, limit: int = 20):
-    today = date.today()
+def catchup_applies(db: Session, user_id: int) -> bool:
+    """True when the user missed days since their last review and isn't on holiday."""
     last_date = get_last_study_date(db, user_id)
     if not last_date:
-        return []  # new user, no catch-up needed
+        return False  # new user, no catch-up needed
+    if (date.today() - last_date).days - 1 <= 0:
+        return False  # no missed days
+    # Skipped during a holiday, with or without skip_catchup set
+    return get_active_holiday(db, user_id) is None
 
-    missed_days = (today - last_date).days - 1
-    if missed_days <= 0:
-        return []  # no missed days
-    
-    holiday = get_active_holiday(db, user_id)
-    if holiday and holiday.skip_catchup:
-        return []  # skip catch-up during holiday
-    if is_on_holiday(db, user_id):
-        return []  # skip catch-up during holiday
-
-    # Collect yesterday's eligible cards
-    yesterday = today - timedelta(days=1)
-    all_cards = db.query(models.Flashcard).filter(models.Flashcard.user_id == user_id).all()
-
-    catchup = []
-    for card in all_cards:
-        if card.box == 1:
-            catchup.append(card)
-        elif card.box == 2 and yesterday.toordinal() % 2 == 0:
-            catchup.append(card)
-        elif card.box == 3 and yesterday.toordinal() % 3 == 0:
-            catchup.append(card)
+def get_daily_queues(db: Session, user_id: int, limit: int = 20):
+    """Today's and catch-up cards for /daily/, with a single flashcards query.
 
+    Fetches up to `limit` overdue and up to `limit` due-today cards in one
+    UNION ALL. Overdue cards are the catch-up queue when catch-up applies,
+    otherwise they lead today's queue.
+    """
     today = date.today()
-    last_date = get_last_study_date(db, user_id)
-    if not last_date:
-        return []
+    def due(*criteria):
+        return select(models.Flashcard.id).filter(
+            models.Flashcard.user_id == user_id, *criteria
+        ).order_by(models.Flashcard.next_due, models.Flashcard.id).limit(limit).subquery()
+    overdue, due_today = due(models.Flashcard.next_due < today), due(models.Flashcard.next_due == today)
+    ids = union_all(select(overdue.c.id), select(due_today.c.id))
+    cards = db.query(models.Flashcard).filter(models.Flashcard.id.in_(ids)).order_by(
+        models.Flashcard.next_due, models.Flashcard.id
+    ).all()
+
+    late = [card for card in cards if card.next_due < today]
+    if catchup_applies(db, user_id):
+        return cards[len(late):], late
+    return cards[:limit], []
 
-    missed_days = (today - last_date).days - 1
-    if missed_days <= 0:
-        return []        
+def get_queue_version(db: Session, user_id: int) -> int:
+    version = db.query(models.UserStats.queue_version).filter(
+        models.UserStats.user_id == user_id
+    ).scalar()
+    return version or 0
 
-    # Shuffle & limit
-    import random
-    random.shuffle(catchup)
-    return catchup[:limit]
+def get_stored_daily_queues(db: Session, user_id: int, version: int, limit: int = 20):
+    """Today's and catch-up cards from the queue stored for today and `version`.
+
+    The first request of the day (or after a review, upload or new holiday
+    bumps the version) builds the queue with get_daily_queues and stores the
+    card ids. Each queue is shuffled with a seed of (user, day, version), so
+    rebuilding from the same state gives the same order and concurrent first
+    requests store identical rows.
+    """
+    today = date.today()
+    stored = db.get(models.DailyQueue, user_id)
+    if stored and stored.day == today and stored.version == version:
+        queues = json.loads(stored.today_ids), json.loads(stored.catchup_ids)
+        cards = {card.id: card for card in db.query(models.Flashcard).filter(
+            models.Flashcard.id.in_(queues[0] + queues[1])
+        )}
+        return tuple([cards[card_id] for card_id in ids if card_id in cards] for ids in queues)
+
+    rng = random.Random(f"{user_id}:{today.isoformat()}:{version}")
+    queues = get_daily_queues(db, user_id, limit)
+    for cards in queues:
+        rng.shuffle(cards)
+        # Detached so the commit below doesn't expire them; they are returned as loaded
+        for card in cards:
+            db.expunge(card)
+    if not stored:
+        stored = models.DailyQueue(user_id=user_id)
+        db.add(stored)
+    stored.day, stored.version = today, version
+    stored.today_ids, stored.catchup_ids = (json.dumps([card.id for card in cards]) for cards in queues)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # another request stored the same queue first
+    return queues
 
 def set_holiday(db: Session, user_id: int, start_date: date, end_date: date):
     holiday = models.Holiday(user_id=user_id, start_date=start_date, end_date=end_date)
     db.add(holiday)
+    # A holiday starting today turns catch-up off
+    _invalidate_daily_queue(_user_stats_for_update(db, user_id))
     db.commit()
     db.refresh(holiday)
     return holiday
 
+def _with_days_left(holiday, today: date):
+    if holiday:
+        holiday.days_left = (holiday.end_date - today).days + 1
+    return holiday
+
 def get_active_holiday(db: Session, user_id: int):
-    today = date.today()
-    return db.query(models.Holiday).filter(
-        models.Holiday.user_id == user_id,
-        models.Holiday.start_date <= today,
-        models.Holiday.end_date >= today
-    ).first()
+    def load():
+        today = date.today()
+        return _with_days_left(db.query(models.Holiday).filter(
+            models.Holiday.user_id == user_id,
+            models.Holiday.start_date <= today,
+            models.Holiday.end_date >= today
+        ).first(), today)
+    return _memoized(db, ("active_holiday", user_id), load)
 
 def is_on_holiday(db: Session, user_id: int) -> bool:
     return get_active_holiday(db, user_id) is not None
@@ -130,14 +467,153 @@ def set_skip_catchup(db: Session, user_id: int, skip: bool):
         db.refresh(holiday)
     return holiday
 
-def get_active_holiday(db: Session, user_id: int):
-    today = date.today()
-    holiday = db.query(models.Holiday).filter(
-        models.Holiday.user_id == user_id,
-        models.Holiday.start_date <= today,
-        models.Holiday.end_date >= today
-    ).first()
 
-    if holiday:
-        holiday.days_left = (holiday.end_date - today).days + 1
-    return holiday
\ No newline at end of file
+def create_ingest_job(db: Session, user_id: int, filename: str, file_path: str):
+    job = models.IngestJob(user_id=user_id, filename=filename, file_path=file_path)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_ingest_job(db: Session, job_id: int):
+    return db.query(models.IngestJob).filter(models.IngestJob.id == job_id).first()
+
+def get_ingest_job_status(db: Session, job_id: int):
+    return db.query(models.IngestJob.status).filter(models.IngestJob.id == job_id).scalar()
+
+def get_ingest_jobs_by_user(db: Session, user_id: int):
+    return db.query(models.IngestJob).filter(
+        models.IngestJob.user_id == user_id
+    ).order_by(models.IngestJob.created_at.desc()).all()
+
+def count_queued_ingest_jobs(db: Session) -> int:
+    return db.query(models.IngestJob).filter(models.IngestJob.status == "queued").count()
+
+def claim_next_ingest_job(db: Session):
+    """Atomically moves the oldest queued job to running; returns it or None."""
+    while True:
+        job = db.query(models.IngestJob).filter(
+            models.IngestJob.status == "queued"
+        ).order_by(models.IngestJob.id).first()
+        if not job:
+            return None
+        # Conditional update so two workers can never claim the same job
+        claimed = db.query(models.IngestJob).filter(
+            models.IngestJob.id == job.id, models.IngestJob.status == "queued"
+        ).update({"status": "running", "updated_at": datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        if claimed:
+            db.refresh(job)
+            return job
+
+def update_ingest_job(db: Session, job_id: int, **fields):
+    fields["updated_at"] = datetime.utcnow()
+    db.query(models.IngestJob).filter(models.IngestJob.id == job_id).update(
+        fields, synchronize_session=False
+    )
+    db.commit()
+
+def save_ingest_chunk(db: Session, job_id: int, flashcards: list[schemas.FlashcardCreate], user_id: int, **progress):
+    """Inserts one chunk's flashcards and records the job's progress past it in one transaction.
+
+    A job resumed after a crash therefore never saves a chunk's cards twice.
+    """
+    rows = _insert_flashcards(db, flashcards, user_id)
+    progress["cards_created"] = models.IngestJob.cards_created + len(rows)
+    progress["updated_at"] = datetime.utcnow()
+    db.query(models.IngestJob).filter(models.IngestJob.id == job_id).update(
+        progress, synchronize_session=False
+    )
+    db.commit()
+    return rows
+
+def finish_ingest_job(db: Session, job_id: int, status: str, error: str = None):
+    # Never overwrite a cancellation that landed while the job was running
+    db.query(models.IngestJob).filter(
+        models.IngestJob.id == job_id, models.IngestJob.status == "running"
+    ).update({"status": status, "error": error, "updated_at": datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+
+def cancel_ingest_job(db: Session, job_id: int):
+    job = get_ingest_job(db, job_id)
+    if job and job.status in ("queued", "running"):
+        job.status = "cancelled"
+        db.commit()
+        db.refresh(job)
+    return job
+
+def touch_ingest_jobs(db: Session, job_ids: list[int]):
+    """Heartbeat for jobs this process is running, so no other process requeues them."""
+    if job_ids:
+        db.query(models.IngestJob).filter(
+            models.IngestJob.id.in_(job_ids), models.IngestJob.status == "running"
+        ).update({"updated_at": datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+
+def requeue_interrupted_ingest_jobs(db: Session, stale_before: datetime) -> int:
+    """Puts running jobs with no heartbeat since stale_before back in the queue.
+
+    Their process died or restarted; jobs live workers are running keep a fresh
+    updated_at. chunks_done is kept so the job resumes after the last finished chunk.
+    """
+    count = db.query(models.IngestJob).filter(
+        models.IngestJob.status == "running", models.IngestJob.updated_at < stale_before
+    ).update({"status": "queued", "updated_at": datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return count
+
+
+def get_ingest_cache(db: Session, content_hash: str):
+    entry = db.query(models.IngestCache).filter(models.IngestCache.content_hash == content_hash).first()
+    if entry:
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+    return entry
+
+def store_ingest_cache(
+    db: Session, content_hash: str, extracted_text: str = None, qa_pairs=None, generation_key: str = None
+):
+    """Creates or updates a cache entry; extracted_text=None keeps the stored text.
+
+    generation_key records the settings qa_pairs were generated with, so they
+    are only reused while those settings still apply.
+    """
+    # Concurrent uploads of the same bytes both get here; the second insert is a no-op
+    db.execute(_dialect_insert(db)(models.IngestCache).values(
+        content_hash=content_hash, extracted_text=""
+    ).on_conflict_do_nothing(index_elements=["content_hash"]))
+    entry = db.query(models.IngestCache).filter(
+        models.IngestCache.content_hash == content_hash
+    ).populate_existing().one()
+    if extracted_text is not None:
+        entry.extracted_text = extracted_text
+    entry.qa_pairs = json.dumps(qa_pairs) if qa_pairs is not None else None
+    entry.generation_key = generation_key if qa_pairs is not None else None
+    entry.size_bytes = len(entry.extracted_text.encode("utf-8")) + len(entry.qa_pairs or "")
+    entry.last_used_at = datetime.utcnow()
+    db.commit()
+    return entry
+
+def evict_ingest_cache(db: Session, max_bytes: int, max_age_days: int) -> int:
+    """Drops entries unused for max_age_days, then least recently used ones until under max_bytes."""
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    removed = db.query(models.IngestCache).filter(
+        models.IngestCache.last_used_at < cutoff
+    ).delete(synchronize_session=False)
+
+    total = db.query(func.coalesce(func.sum(models.IngestCache.size_bytes), 0)).scalar()
+    if total > max_bytes:
+        rows = db.query(models.IngestCache.id, models.IngestCache.size_bytes).order_by(
+            models.IngestCache.last_used_at
+        ).all()
+        stale = []
+        for entry_id, size in rows:
+            if total <= max_bytes:
+                break
+            stale.append(entry_id)
+            total -= size
+        removed += db.query(models.IngestCache).filter(
+            models.IngestCache.id.in_(stale)
+        ).delete(synchronize_session=False)
+    db.commit()
+    return removed
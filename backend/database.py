@@ -1,8 +1,13 @@
 # backend/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeout
 import os
+import threading
+import time
 
 # Load environment variables from .env for local development
 try:
@@ -15,12 +20,107 @@ except Exception:
 # Use DATABASE_URL from environment if present; otherwise default to a local sqlite file
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./flashcards.db")
 
+# Pool settings are per process: with several workers the database sees up to
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 to never recycle
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# single writer, and busy_timeout makes writers wait for the lock instead of
+# failing straight away.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+}
+
+
+class PoolStats:
+    """How long requests waited for a connection, opening new ones included."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def as_dict(self):
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_total": round(self.wait_total * 1000, 1),
+            "wait_ms_avg": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_max * 1000, 1),
+        }
+
+
+pool_stats = PoolStats()
+
+
+def _timed_pool(base):
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeout:
+                pool_stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            pool_stats.record(time.perf_counter() - start)
+            return connection
+    return TimedPool
+
+
+def _engine_options(url: str, pool_class):
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}  # in-memory databases keep their single shared connection
+    return {
+        "poolclass": _timed_pool(pool_class),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def pool_status():
+    """Checkout wait stats plus the current state of each engine's pool."""
+    status = pool_stats.as_dict()
+    for name, eng in (("sync", engine), ("async", async_engine)):
+        if eng is not None and hasattr(eng.pool, "checkedout"):
+            status[name] = {"size": eng.pool.size(), "checked_out": eng.pool.checkedout(), "overflow": eng.pool.overflow()}
+    return status
+
+
 # For sqlite, disable the check_same_thread flag which is required when using SQLAlchemy
 connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **_engine_options(DATABASE_URL, QueuePool))
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -34,3 +134,51 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Optional async engine (aiosqlite / asyncpg) so request handlers don't hold a
+# threadpool slot while waiting on the database. Off unless ASYNC_DB is set;
+# ASYNC_DATABASE_URL overrides the driver picked from DATABASE_URL.
+ASYNC_DB = os.getenv("ASYNC_DB", "").lower() in ("1", "true", "yes")
+
+def _async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme in ("postgres", "postgresql") or scheme.startswith("postgresql+"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool)
+    )
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    # Objects are read after commit without lazy loads, which async sessions can't do
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_db(db, fn, *args, **kwargs):
+    """Calls the sync crud function fn(session, *args, **kwargs) without blocking the event loop.
+
+    With an AsyncSession it runs through run_sync, so the queries go through
+    the async driver on the loop; with a plain Session it runs in the
+    threadpool, like a sync endpoint would.
+    """
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(fn, *args, **kwargs)
+    from starlette.concurrency import run_in_threadpool
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
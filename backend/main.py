@@ -1,24 +1,45 @@
 # backend/main.py
-from fastapi import FastAPI, UploadFile, Depends, HTTPException, File, Form
+from fastapi import FastAPI, UploadFile, Depends, HTTPException, File, Form, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from .database import Base, engine, SessionLocal
+from .database import SessionLocal, ASYNC_DB, get_async_db, run_db, dispose_async_engine, pool_status
 from . import models, crud, schemas
 from .utils import flashcards as flashcard_service
+from .utils import jobs as ingest_jobs
+from .utils.llm_cache import chunk_cache, CacheStats
 from .schemas import ReviewCreate
 from pydantic import BaseModel
-from datetime import datetime
-import os, shutil
+from datetime import date, datetime, timedelta
+from contextlib import asynccontextmanager
+import os
+import json
 from .utils.chunking import chunk_text
+from .utils import pagination
+from typing import Literal, Optional
 
-UPLOAD_DIR = "uploads"
 FRONTEND_BUILD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "build")
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# /progress/ range when none is given, and the longest range it accepts
+PROGRESS_DEFAULT_DAYS = 30
+PROGRESS_MAX_DAYS = 731
 
-app = FastAPI(title="AI Flashcard SaaS MVP")
+# Tables are managed by alembic: run `alembic upgrade head` before starting the
+# app (scripts/start-production.sh does). Creating them here on import raced
+# when several workers started at once.
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background ingest workers live for the lifetime of the process
+    await ingest_jobs.start()
+    yield
+    await ingest_jobs.stop()
+    await flashcard_service.close_http_client()
+    await flashcard_service.shutdown_extract_executor()
+    await dispose_async_engine()
+
+app = FastAPI(title="AI Flashcard SaaS MVP", lifespan=lifespan)
 
 # Allow frontend requests
 app.add_middleware(
@@ -27,17 +48,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER],
 )
 
-# If build exists, serve it (lets users open http://localhost:8000/)
-if os.path.isdir(FRONTEND_BUILD_DIR):
-    app.mount("/", StaticFiles(directory=FRONTEND_BUILD_DIR, html=True), name="frontend")
-
 # Health endpoint for readiness checks
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+# Process-wide counters: what caching saves in Gemini calls, and how long
+# requests wait for a database connection
+@app.get("/metrics")
+def metrics():
+    return {"llm_cache": chunk_cache.stats.as_dict(), "db_pool": pool_status()}
+
 # Dependency for DB session
 def get_db():
     db = SessionLocal()
@@ -46,6 +70,9 @@ def get_db():
     finally:
         db.close()
 
+# Session for the review/dashboard endpoints: async engine when ASYNC_DB is set
+get_request_db = get_async_db if ASYNC_DB else get_db
+
 # Primary upload endpoint that generates flashcards
 @app.post("/upload/")
 async def upload_file(file: UploadFile = File(...), user_id: int = Form(...), db: Session = Depends(get_db)):
@@ -53,25 +80,141 @@ async def upload_file(file: UploadFile = File(...), user_id: int = Form(...), db
     Uploads a file, extracts text, and generates flashcards.
     """
     try:
-        flashcards = await flashcard_service.process_file(file, user_id, db)
-        return {"flashcards": flashcards}
+        cache_stats = CacheStats()
+        flashcards = await flashcard_service.process_file(file, user_id, db, cache_stats)
+        return {"flashcards": flashcards, "llm_cache": cache_stats.as_dict()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Streaming upload: NDJSON events, one "flashcards" event per finished chunk
+@app.post("/upload/stream")
+async def upload_file_stream(file: UploadFile = File(...), user_id: int = Form(...)):
+    contents = await file.read()
+
+    async def events():
+        # The stream outlives the request's dependencies, so it owns its session
+        db = SessionLocal()
+        cache_stats = CacheStats()
+        created = 0
+        try:
+            async for done, seen, cards in flashcard_service.iter_process_file(
+                file.filename, contents, user_id, db, cache_stats
+            ):
+                created += len(cards)
+                yield json.dumps({"type": "flashcards", "chunk": done - 1, "flashcards": cards}, default=str) + "\n"
+                yield json.dumps({
+                    "type": "progress", "chunks_done": done, "chunks_total": seen, "cards_created": created
+                }) + "\n"
+            yield json.dumps({
+                "type": "done", "cards_created": created, "llm_cache": cache_stats.as_dict()
+            }) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+# Background upload: returns a job id at once, progress is polled via /jobs/
+@app.post("/jobs/", response_model=schemas.IngestJob)
+async def create_ingest_job(file: UploadFile = File(...), user_id: int = Form(...)):
+    try:
+        return await ingest_jobs.submit(file.filename, await file.read(), user_id)
+    except ingest_jobs.QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.get("/jobs/{job_id}", response_model=schemas.IngestJob)
+def get_ingest_job(job_id: int, db: Session = Depends(get_db)):
+    job = crud.get_ingest_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/user/{user_id}", response_model=list[schemas.IngestJob])
+def get_ingest_jobs(user_id: int, db: Session = Depends(get_db)):
+    return crud.get_ingest_jobs_by_user(db, user_id)
+
+@app.post("/jobs/{job_id}/cancel", response_model=schemas.IngestJob)
+async def cancel_ingest_job(job_id: int):
+    job = await ingest_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _decode_cursor(cursor):
+    try:
+        return pagination.decode_cursor(cursor) if cursor else None
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+PageLimit = Query(pagination.PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE)
+
 @app.get("/flashcards/{user_id}")
-def get_flashcards(user_id: int, db: Session = Depends(get_db)):
+async def get_flashcards(
+    user_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    db=Depends(get_request_db),
+):
     """
-    Fetch all flashcards for a user.
+    Fetch a user's flashcards, oldest first, one page at a time.
+    The next page's cursor comes back in the X-Next-Cursor header.
     """
-    return crud.get_flashcards_by_user(db, user_id)
+    cards, more = await run_db(db, crud.get_flashcards_page, user_id, limit, _decode_cursor(cursor))
+    if more:
+        last = cards[-1]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(last.created_at, last.id)
+    return cards
 
 @app.post("/review/")
-def submit_review(review: ReviewCreate, db: Session = Depends(get_db)):
-    return crud.create_review(db, review)
+async def submit_review(review: ReviewCreate, db=Depends(get_request_db)):
+    return await run_db(db, crud.create_review, review)
+
+# A whole review session in one request and one transaction
+@app.post("/review/batch")
+async def submit_reviews(batch: schemas.ReviewBatchCreate, db=Depends(get_request_db)):
+    try:
+        cards = await run_db(db, crud.create_reviews, batch.user_id, batch.reviews)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail={"message": "Flashcards not found for this user", "flashcard_ids": e.args[0]})
+    return {"count": len(batch.reviews), "cards": cards}
+
+@app.get("/stats/{user_id}", response_model=schemas.UserStats)
+async def get_stats(user_id: int, db=Depends(get_request_db)):
+    return await run_db(db, crud.get_user_stats, user_id)
+
+# Chart data: review counts grouped by day or week, instead of the raw history
+@app.get("/progress/{user_id}")
+async def get_progress(
+    user_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: Literal["day", "week"] = "day",
+    db=Depends(get_request_db),
+):
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=PROGRESS_DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= PROGRESS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {PROGRESS_MAX_DAYS} days")
+    return await run_db(db, crud.get_progress, user_id, start, end, bucket)
 
 @app.get("/history/{user_id}")
-def get_history(user_id: int, db: Session = Depends(get_db)):
-    return crud.get_user_history(db, user_id)
+async def get_history(
+    user_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    db=Depends(get_request_db),
+):
+    """Reviews newest first, paginated like /flashcards/."""
+    reviews, more = await run_db(db, crud.get_user_history_page, user_id, limit, _decode_cursor(cursor))
+    if more:
+        last = reviews[-1]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(last.timestamp, last.id)
+    return reviews
 
 class HolidayRequest(BaseModel):
     user_id: int
@@ -79,64 +222,69 @@ class HolidayRequest(BaseModel):
     end_date: str
 
 @app.post("/holiday/")
-def add_holiday(request: HolidayRequest, db: Session = Depends(get_db)):
+async def add_holiday(request: HolidayRequest, db=Depends(get_request_db)):
     start = datetime.strptime(request.start_date, "%Y-%m-%d").date()
     end = datetime.strptime(request.end_date, "%Y-%m-%d").date()
-    return crud.set_holiday(db, request.user_id, start, end)
+    return await run_db(db, crud.set_holiday, request.user_id, start, end)
 
 @app.get("/holiday/{user_id}")
-def check_holiday(user_id: int, db: Session = Depends(get_db)):
-    return {"on_holiday": crud.is_on_holiday(db, user_id)}
+async def check_holiday(user_id: int, db=Depends(get_request_db)):
+    return {"on_holiday": await run_db(db, crud.is_on_holiday, user_id)}
 
 # Add endpoints to extend and toggle catch-up skipping during holiday
 @app.post("/holiday/extend/{user_id}")
-def extend_holiday(user_id: int, extra_days: int, db: Session = Depends(get_db)):
-    holiday = crud.extend_holiday(db, user_id, extra_days)
+async def extend_holiday(user_id: int, extra_days: int, db=Depends(get_request_db)):
+    holiday = await run_db(db, crud.extend_holiday, user_id, extra_days)
     if not holiday:
         raise HTTPException(status_code=404, detail="No active holiday to extend")
     return holiday
 
 @app.post("/holiday/skip/{user_id}")
-def set_skip_catchup(user_id: int, skip: bool, db: Session = Depends(get_db)):
-    holiday = crud.set_skip_catchup(db, user_id, skip)
+async def set_skip_catchup(user_id: int, skip: bool, db=Depends(get_request_db)):
+    holiday = await run_db(db, crud.set_skip_catchup, user_id, skip)
     if not holiday:
         raise HTTPException(status_code=404, detail="No active holiday to update")
     return holiday
 
 # Enhanced dashboard endpoint (keep only this version)
 @app.get("/dashboard/{user_id}")
-def get_dashboard(user_id: int, db: Session = Depends(get_db)):
-    history = crud.get_user_history(db, user_id)
-    mastered = crud.get_mastered_count(db, user_id)
-    holiday = crud.get_active_holiday(db, user_id)
-
-    def calculate_streak(history):
-        dates = sorted({h.timestamp.date() for h in history})
-        streak = 0
-        if dates:
-            streak = 1
-            for i in range(len(dates) - 1, 0, -1):
-                if (dates[i] - dates[i-1]).days == 1:
-                    streak += 1
-                else:
-                    break
-        if crud.is_on_holiday(db, user_id):
-            return 0
-        return streak
-
-    return {
-        "history": history,
-        "mastered": mastered,
-        "streak": calculate_streak(history),
+async def get_dashboard(user_id: int, lean: bool = False, db=Depends(get_request_db)):
+    """
+    Counters, streak and holiday from one query; lean=true leaves out the
+    full review history (the only other query).
+    """
+    stats, holiday = await run_db(db, crud.get_dashboard_summary, user_id)
+    dashboard = {
+        "mastered": stats.mastered,
+        "stats": schemas.UserStats.model_validate(stats, from_attributes=True),
+        # Kept up to date by each review; shown as 0 while a holiday freezes it
+        "streak": 0 if holiday else stats.current_streak,
         "streak_status": "frozen" if holiday else "active",
         "holiday": holiday
     }
+    if not lean:
+        dashboard["history"] = await run_db(db, crud.get_user_history, user_id)
+    return dashboard
 
 # Enhanced daily review endpoint (keep only this version)
 @app.get("/daily/{user_id}")
-def get_daily(user_id: int, db: Session = Depends(get_db)):
-    today_cards = crud.get_daily_cards(db, user_id)
-    catchup_cards = crud.get_catchup_cards(db, user_id)
+async def get_daily(
+    user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db=Depends(get_request_db),
+):
+    # The queue is stored per day and version; reviews, uploads and new holidays
+    # bump the version, so the ETag only needs the day and the version
+    version = await run_db(db, crud.get_queue_version, user_id)
+    etag = f'"{date.today().isoformat()}.{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    # Overdue cards show up under catch-up when it applies, otherwise in today's queue
+    today_cards, catchup_cards = await run_db(db, crud.get_stored_daily_queues, user_id, version)
 
     return {
         "today": today_cards,
@@ -144,30 +292,22 @@ def get_daily(user_id: int, db: Session = Depends(get_db)):
         "missed_days": len(catchup_cards) > 0
     }
 
+@app.get("/due/{user_id}")
+async def get_due_count(user_id: int, db=Depends(get_request_db)):
+    return {"due": await run_db(db, crud.count_due_cards, user_id)}
+
 # Optional: chunk-only endpoint for debugging
 @app.post("/upload/chunks")
 async def upload_file_chunks(user_id: int = Form(...), file: UploadFile = File(...)):
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # Extract text depending on file type
-    if file.filename.endswith(".pdf"):
-        from .utils.extractors import extract_pdf
-        text = extract_pdf(file_path)
-    elif file.filename.endswith(".docx"):
-        from .utils.extractors import extract_docx
-        text = extract_docx(file_path)
-    elif file.filename.endswith(".pptx"):
-        from .utils.extractors import extract_pptx
-        text = extract_pptx(file_path)
-    else:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            text = f.read()
+    # Extract text off the event loop, same as the primary upload path
+    text = await flashcard_service.extract_text(file)
 
     # Chunk the text
     chunks = chunk_text(text)
 
-    return {"chunks": chunks, "count": len(chunks)}
\ No newline at end of file
+    return {"chunks": chunks, "count": len(chunks)}
+
+# If build exists, serve it (lets users open http://localhost:8000/).
+# Mounted last so the catch-all "/" mount doesn't shadow the API routes.
+if os.path.isdir(FRONTEND_BUILD_DIR):
+    app.mount("/", StaticFiles(directory=FRONTEND_BUILD_DIR, html=True), name="frontend")
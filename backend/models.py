@@ -1,8 +1,8 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Date, Boolean, Index
 from sqlalchemy.orm import relationship
 from .database import Base
-from datetime import datetime
+from datetime import date, datetime
 
 class User(Base):
     __tablename__ = "users"
@@ -20,9 +20,18 @@ class Flashcard(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     box = Column(Integer, default=1)
     last_reviewed = Column(Date, nullable=True)
+    next_due = Column(Date, default=date.today)  # new cards are due the day they are created
 
     owner = relationship("User", back_populates="flashcards")
 
+    # Due queues are range scans on (user_id, next_due); box counts filter on (user_id, box);
+    # listing pages through (user_id, created_at)
+    __table_args__ = (
+        Index("ix_flashcards_user_id_next_due", "user_id", "next_due"),
+        Index("ix_flashcards_user_id_box", "user_id", "box"),
+        Index("ix_flashcards_user_id_created_at", "user_id", "created_at"),
+    )
+
 class Review(Base):
     __tablename__ = "reviews"
     id = Column(Integer, primary_key=True, index=True)
@@ -34,6 +43,8 @@ class Review(Base):
     user = relationship("User")
     flashcard = relationship("Flashcard")
 
+    __table_args__ = (Index("ix_reviews_user_id_timestamp", "user_id", "timestamp"),)
+
 class Holiday(Base):
     __tablename__ = "holidays"
     id = Column(Integer, primary_key=True, index=True)
@@ -43,3 +54,62 @@ class Holiday(Base):
     skip_catchup = Column(Boolean, default=False)
     
     user = relationship("User")
+
+    __table_args__ = (Index("ix_holidays_user_id_dates", "user_id", "start_date", "end_date"),)
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    current_streak = Column(Integer, default=0)  # consecutive study days ending at last_study_date
+    last_study_date = Column(Date, nullable=True)  # UTC day of the latest review
+    box1_cards = Column(Integer, default=0)
+    box2_cards = Column(Integer, default=0)
+    box3_cards = Column(Integer, default=0)
+    total_reviews = Column(Integer, default=0)
+    correct_reviews = Column(Integer, default=0)
+    queue_version = Column(Integer, default=0)  # bumped by writes that change the daily queue
+
+    user = relationship("User")
+
+    @property
+    def mastered(self):
+        return self.box3_cards or 0
+
+class DailyQueue(Base):
+    __tablename__ = "daily_queues"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date)
+    version = Column(Integer)  # user_stats.queue_version the queue was built from
+    today_ids = Column(Text)  # JSON lists of flashcard ids, in review order
+    catchup_ids = Column(Text)
+
+    user = relationship("User")
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    filename = Column(String)
+    file_path = Column(String)  # stored upload, removed once the job finishes
+    status = Column(String, default="queued", index=True)  # queued, running, completed, failed, cancelled
+    chunks_total = Column(Integer, default=0)
+    chunks_done = Column(Integer, default=0)
+    cards_created = Column(Integer, default=0)
+    llm_cache_hits = Column(Integer, default=0)
+    llm_cache_misses = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user = relationship("User")
+
+class IngestCache(Base):
+    __tablename__ = "ingest_cache"
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, unique=True, index=True)  # sha256 of the uploaded bytes
+    extracted_text = Column(Text)
+    qa_pairs = Column(Text, nullable=True)  # JSON list of per-chunk results, set once generation completed
+    generation_key = Column(String, nullable=True)  # model, prompt version and chunk settings qa_pairs came from
+    size_bytes = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,7 +1,8 @@
 # backend/schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pydantic import ConfigDict
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional
 
 class FlashcardBase(BaseModel):
     question: str
@@ -25,9 +26,44 @@ class ReviewBase(BaseModel):
 class ReviewCreate(ReviewBase):
     user_id: int
 
+class ReviewBatchCreate(BaseModel):
+    user_id: int
+    reviews: list[ReviewBase] = Field(max_length=500)
+
 class Review(ReviewBase):
     id: int
     timestamp: datetime
 
     class Config:
         model_config = ConfigDict(from_attributes=True)
+
+class IngestJob(BaseModel):
+    id: int
+    user_id: int
+    filename: str
+    status: str
+    chunks_total: int
+    chunks_done: int
+    cards_created: int
+    llm_cache_hits: int = 0
+    llm_cache_misses: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        model_config = ConfigDict(from_attributes=True)
+
+class UserStats(BaseModel):
+    user_id: int
+    current_streak: int = 0
+    last_study_date: Optional[date] = None
+    box1_cards: int = 0
+    box2_cards: int = 0
+    box3_cards: int = 0
+    mastered: int = 0
+    total_reviews: int = 0
+    correct_reviews: int = 0
+
+    class Config:
+        model_config = ConfigDict(from_attributes=True)
@@ -1,12 +1,183 @@
 # backend/utils/chunking.py
 import re
+from operator import add
 
-def chunk_text(text, chunk_size=300, overlap=50):
+# A sentence end and the whitespace after it, allowing a closing quote/bracket: end." or (end.)
+# The captured punctuation is glued back onto its sentence after splitting.
+_SENTENCE_BREAK = re.compile(r"([.!?][\"')\]]?)\s+")
+_ENDS_SENTENCE = re.compile(r"[.!?][\"')\]]?\s*$")
+
+# Cost of a piece of text per budget unit. "tokens" is the usual ~4 chars per
+# token estimate, close enough for sizing LLM prompts without a tokenizer.
+_COSTS = {
+    "chars": lambda text: len(text) + 1,
+    "words": lambda text: len(text.split()),
+    "tokens": lambda text: len(text) // 4 + 1,
+}
+
+
+class Chunker:
+    """Incremental chunker: feed text pieces, get chunks back as they fill up.
+
+    Chunks stay within `budget` chars, words or tokens. With snap_to_sentences
+    they are built from whole sentences, except that a single sentence longer
+    than the budget is split between words. `overlap` repeats up to that much
+    budget from the end of a chunk at the start of the next one.
+    Pieces are treated as separated by whitespace. Text is only split and
+    joined once per sentence (or word), so the cost is linear in the input.
+    """
+
+    def __init__(self, budget: int = 2000, unit: str = "chars", overlap: int = 0, snap_to_sentences: bool = True):
+        if unit not in _COSTS:
+            raise ValueError(f"unit must be one of {', '.join(_COSTS)}")
+        if not 0 <= overlap < budget:
+            raise ValueError("overlap must be smaller than the budget")
+        self.budget = budget
+        self.overlap = overlap
+        self.snap_to_sentences = snap_to_sentences
+        self.unit = unit
+        self._cost = _COSTS[unit]
+        self._chunk, self._costs, self._chunk_cost = [], [], 0
+        self._fresh = 0  # segments in the chunk that weren't carried over as overlap
+        self._pending = ""  # start of a sentence that continues in the next piece
+        self._long = False  # the sentence continuing in the next piece outgrew the budget
+
+    def _emit(self, out: list):
+        out.append(" ".join(self._chunk))
+        keep, cost = 0, 0
+        for segment_cost in reversed(self._costs):
+            if cost + segment_cost > self.overlap:
+                break
+            keep += 1
+            cost += segment_cost
+        self._chunk = self._chunk[len(self._chunk) - keep:]
+        self._costs = self._costs[len(self._costs) - keep:]
+        self._chunk_cost, self._fresh = cost, 0
+
+    def _push(self, segment: str, cost: int, out: list):
+        if self._chunk_cost + cost > self.budget:
+            if self._fresh:
+                self._emit(out)
+            if self._chunk_cost + cost > self.budget:
+                # Not even the overlap fits alongside it
+                self._chunk, self._costs, self._chunk_cost = [], [], 0
+        self._chunk.append(segment)
+        self._costs.append(cost)
+        self._chunk_cost += cost
+        self._fresh += 1
+
+    def _add_words(self, text: str, out: list):
+        for word in text.split():
+            self._push(word, self._cost(word), out)
+
+    def _add_sentence(self, sentence: str, out: list):
+        cost = self._cost(sentence)
+        if cost <= self.budget:
+            self._push(sentence, cost, out)
+        else:
+            self._add_words(sentence, out)
+
+    def _add_all(self, segments: list, out: list, split_oversize: bool):
+        # Hot loop: appends inline and only calls _push when the chunk is full
+        budget = self.budget
+        for segment, cost in zip(segments, map(self._cost, segments)):
+            if self._chunk_cost + cost <= budget:
+                self._chunk.append(segment)
+                self._costs.append(cost)
+                self._chunk_cost += cost
+                self._fresh += 1
+            elif split_oversize and cost > budget:
+                self._add_sentence(segment, out)
+            else:
+                self._push(segment, cost, out)
+
+    def _add_words_by_count(self, words: list, out: list):
+        # Every word costs 1, so fill the chunk a slice at a time
+        i = 0
+        while i < len(words):
+            room = self.budget - self._chunk_cost
+            if not room:
+                self._emit(out)
+                continue
+            taken = words[i:i + room]
+            self._chunk += taken
+            self._costs += [1] * len(taken)
+            self._chunk_cost += len(taken)
+            self._fresh += len(taken)
+            i += len(taken)
+
+    def feed(self, piece: str) -> list[str]:
+        out = []
+        if not self.snap_to_sentences:
+            if self.unit == "words":
+                self._add_words_by_count(piece.split(), out)
+            else:
+                self._add_all(piece.split(), out, split_oversize=False)
+            return out
+
+        parts = _SENTENCE_BREAK.split(piece)
+        sentences = list(map(add, parts[0:-1:2], parts[1::2]))
+        last = parts[-1]
+        if self._long:
+            # Finish word-splitting the long sentence, as if it had arrived whole
+            if not sentences:
+                self._add_words(last, out)
+                self._long = not _ENDS_SENTENCE.search(last)
+                return out
+            self._add_words(sentences.pop(0), out)
+            self._long = False
+        elif self._pending:
+            if sentences:
+                sentences[0] = self._pending + " " + sentences[0]
+            else:
+                last = self._pending + " " + last
+        if sentences:
+            sentences[0] = sentences[0].strip()
+            if not sentences[0]:
+                sentences.pop(0)
+        self._add_all(sentences, out, split_oversize=True)
+
+        self._pending = ""
+        if _ENDS_SENTENCE.search(last):
+            if last.strip():
+                self._add_sentence(last.strip(), out)
+        elif self._cost(last.strip()) > self.budget:
+            # Don't hold back an unbounded sentence, split what we have of it now.
+            # Costed stripped, as flush() would add it, so a blank piece can't tip it over.
+            self._add_words(last, out)
+            self._long = True
+        else:
+            self._pending = last
+        return out
+
+    def flush(self) -> list[str]:
+        out = []
+        if self._pending.strip():
+            self._add_sentence(self._pending.strip(), out)
+        self._pending, self._long = "", False
+        if self._fresh:
+            out.append(" ".join(self._chunk))
+        self._chunk, self._costs, self._chunk_cost, self._fresh = [], [], 0, 0
+        return out
+
+
+def iter_chunks(pieces, budget: int = 2000, unit: str = "chars", overlap: int = 0, snap_to_sentences: bool = True):
+    chunker = Chunker(budget, unit, overlap, snap_to_sentences)
+    for piece in pieces:
+        yield from chunker.feed(piece)
+    yield from chunker.flush()
+
+
+async def aiter_chunks(pieces, budget: int = 2000, unit: str = "chars", overlap: int = 0, snap_to_sentences: bool = True):
+    """Chunks an async stream of text pieces, yielding each chunk once it is full."""
+    chunker = Chunker(budget, unit, overlap, snap_to_sentences)
+    async for piece in pieces:
+        for chunk in chunker.feed(piece):
+            yield chunk
+    for chunk in chunker.flush():
+        yield chunk
+
+
+def chunk_text(text, chunk_size=300, overlap=50, unit="words", snap_to_sentences=False):
     """Splits text into overlapping chunks."""
-    words = re.split(r"\s+", text)
-    chunks, i = [], 0
-    while i < len(words):
-        chunk = words[i:i+chunk_size]
-        chunks.append(" ".join(chunk))
-        i += chunk_size - overlap
-    return chunks
+    return list(iter_chunks([text], chunk_size, unit, overlap, snap_to_sentences))
@@ -1,21 +1,74 @@
 # backend/utils/extractors.py
-import fitz  # PyMuPDF for PDFs
-import docx
-from pptx import Presentation
+# Each parser is imported by the function that needs it, so a .docx upload
+# never loads PyMuPDF and a plain-text upload loads none of them
+import os
+from collections import deque
 
-def extract_pdf(file_path):
-    doc = fitz.open(file_path)
-    return " ".join([page.get_text() for page in doc])
+# PDFs with at least this many pages are split into page ranges across processes
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+# Page range size when streaming through a shared pool; smaller means earlier first text
+PDF_BATCH_PAGES = int(os.getenv("PDF_BATCH_PAGES", "32"))
+
+
+def _extract_pdf_pages(file_path, start, stop):
+    import fitz  # PyMuPDF
+
+    # Each worker opens its own handle, fitz documents can't be shared across processes
+    with fitz.open(file_path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+
+def _page_ranges(page_count, size):
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def iter_pdf(file_path, executor=None, batch_pages=PDF_BATCH_PAGES, workers=1):
+    """Yields the text of each page, in page order.
+
+    With an executor, page ranges are extracted by its `workers` processes and
+    yielded as soon as every earlier range is done; documents under
+    PDF_PARALLEL_MIN_PAGES go as a single range.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        if executor is None:
+            for page in doc:
+                yield page.get_text()
+            return
+        page_count = doc.page_count
+
+    if page_count < PDF_PARALLEL_MIN_PAGES:
+        batch_pages = max(page_count, 1)
+    ranges = deque(_page_ranges(page_count, batch_pages))
+    pending = deque()
+    try:
+        while ranges or pending:
+            # Keep a bounded number of ranges in flight ahead of the consumer
+            while ranges and len(pending) < 2 * workers:
+                start, stop = ranges.popleft()
+                pending.append(executor.submit(_extract_pdf_pages, file_path, start, stop))
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def iter_docx(file_path):
+    import docx
 
-def extract_docx(file_path):
     doc = docx.Document(file_path)
-    return " ".join([p.text for p in doc.paragraphs])
+    for p in doc.paragraphs:
+        yield p.text
+
+
+def iter_pptx(file_path):
+    """Yields the text of each slide."""
+    from pptx import Presentation
 
-def extract_pptx(file_path):
     prs = Presentation(file_path)
-    text_runs = []
     for slide in prs.slides:
-        for shape in slide.shapes:
-            if hasattr(shape, "text"):
-                text_runs.append(shape.text)
-    return " ".join(text_runs)
+        text_runs = [shape.text for shape in slide.shapes if hasattr(shape, "text")]
+        if text_runs:
+            yield " ".join(text_runs)
+
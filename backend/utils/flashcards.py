@@ -1,75 +1,196 @@
 # backend/utils/flashcards.py
 import os
 import json
-import requests
+import asyncio
+import hashlib
+import logging
+import uuid
+from typing import TYPE_CHECKING
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
 from .. import crud, schemas
+from ..database import SessionLocal
+from .llm_cache import chunk_cache, make_key, CacheStats
+from .chunking import aiter_chunks
 
-# Load API key from environment for local dev
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    import httpx
+
+# Load API key from environment for local dev (the URL can point at a local fake server)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
+GEMINI_API_URL = os.getenv(
+    "GEMINI_API_URL", f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
+)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_TIMEOUT = 30
+# Max in-flight Gemini requests per document; also sizes the shared connection pool
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "8"))
+_http_client = None
 
+# Re-uploads of identical bytes reuse the stored extraction and generated cards
+INGEST_CACHE_MAX_MB = int(os.getenv("INGEST_CACHE_MAX_MB", "256"))
+INGEST_CACHE_MAX_AGE_DAYS = int(os.getenv("INGEST_CACHE_MAX_AGE_DAYS", "30"))
 
-def _extract_text_sync(file: UploadFile) -> str:
-    """Extracts text by saving to disk and using typed extractors."""
-    # Lazy import to avoid hard dependency at module import time
-    from . import extractors  # type: ignore
+# Chunk size for generation, in CHUNK_UNIT (chars, words or tokens), snapped to sentence ends
+CHUNK_BUDGET = int(os.getenv("CHUNK_BUDGET", "2000"))
+CHUNK_UNIT = os.getenv("CHUNK_UNIT", "chars")
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "0"))
+
+# Document parsing is CPU-bound and holds the GIL, so it runs in separate processes
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+_extract_executor = None
+
+
+def _get_extract_executor() -> "ProcessPoolExecutor":
+    # Created on first use so importing the app (or forking workers) never spawns processes
+    global _extract_executor
+    if _extract_executor is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Forking a process that already runs threads (the server's threadpool) can
+        # deadlock the child, so start workers from a clean forkserver (spawn on Windows)
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _extract_executor = ProcessPoolExecutor(
+            max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context(method)
+        )
+    return _extract_executor
+
+
+async def shutdown_extract_executor():
+    """Stops the extraction processes so they don't outlive the app."""
+    global _extract_executor
+    if _extract_executor is not None:
+        executor, _extract_executor = _extract_executor, None
+        await run_in_threadpool(executor.shutdown, wait=True, cancel_futures=True)
 
-    filename = file.filename.lower()
-    contents = file.file.read()
-    temp_path = f"uploads/_tmp_{os.getpid()}_{os.path.basename(filename)}"
+
+def _write_temp_file(filename: str, contents: bytes) -> str:
+    temp_path = os.path.join("uploads", f"_tmp_{uuid.uuid4().hex}_{os.path.basename(filename)}")
     os.makedirs(os.path.dirname(temp_path), exist_ok=True)
     with open(temp_path, "wb") as f:
         f.write(contents)
+    return temp_path
+
 
+def _remove_temp_file(temp_path: str):
+    try:
+        os.remove(temp_path)
+    except Exception:
+        pass
+
+
+def _extract_pieces_sync(filename: str, temp_path: str) -> list[str]:
+    """Runs in the extraction pool: paragraphs of a .docx or slides of a .pptx."""
+    # Lazy import to avoid hard dependency at module import time
+    from . import extractors  # type: ignore
+
+    if filename.endswith(".docx"):
+        return list(extractors.iter_docx(temp_path))
+    return list(extractors.iter_pptx(temp_path))
+
+
+async def iter_document_text(filename: str, contents: bytes):
+    """Yields the text of an upload piece by piece (page, paragraph or slide).
+
+    PDF pages are extracted in page ranges by the extraction pool and yielded
+    as each range finishes, so chunking can start before the whole document
+    has been read.
+    """
+    filename = filename.lower()
+    if not filename.endswith((".pdf", ".docx", ".pptx")):
+        yield contents.decode("utf-8", errors="ignore")
+        return
+    # Only now, and extractors itself only imports the parser for this format
+    from . import extractors  # type: ignore
+
+    temp_path = await run_in_threadpool(_write_temp_file, filename, contents)
     try:
         if filename.endswith(".pdf"):
-            return extractors.extract_pdf(temp_path)
-        if filename.endswith(".docx"):
-            return extractors.extract_docx(temp_path)
-        if filename.endswith(".pptx"):
-            return extractors.extract_pptx(temp_path)
-        return contents.decode("utf-8", errors="ignore")
+            pages = extractors.iter_pdf(temp_path, executor=_get_extract_executor(), workers=EXTRACT_WORKERS)
+            try:
+                async for page in iterate_in_threadpool(pages):
+                    yield page
+            finally:
+                await run_in_threadpool(pages.close)
+        else:
+            loop = asyncio.get_running_loop()
+            pieces = await loop.run_in_executor(
+                _get_extract_executor(), _extract_pieces_sync, filename, temp_path
+            )
+            for piece in pieces:
+                yield piece
     finally:
-        try:
-            os.remove(temp_path)
-        except Exception:
-            pass
+        await run_in_threadpool(_remove_temp_file, temp_path)
 
 
-def chunk_text(text: str, max_chars: int = 2000) -> list[str]:
-    sentences = text.split(". ")
-    chunks, current = [], ""
-    for sentence in sentences:
-        if len(current) + len(sentence) < max_chars:
-            current += sentence + ". "
-        else:
-            if current:
-                chunks.append(current.strip())
-            current = sentence + ". "
-    if current:
-        chunks.append(current.strip())
-    return chunks
+async def extract_text_from_bytes(filename: str, contents: bytes) -> str:
+    """Extracts the full text of raw file contents."""
+    return " ".join([piece async for piece in iter_document_text(filename, contents)])
+
+
+async def extract_text(file: UploadFile) -> str:
+    return await extract_text_from_bytes(file.filename, await file.read())
+
+
+def _get_http_client() -> "httpx.AsyncClient":
+    # One keep-alive pool shared by every generation call in this process.
+    # httpx is imported on first use so the app starts without loading it.
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=GEMINI_CONCURRENCY * 4, max_keepalive_connections=GEMINI_CONCURRENCY
+        )
+        _http_client = httpx.AsyncClient(timeout=GEMINI_TIMEOUT, limits=limits)
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def valid_qa_pairs(parsed):
+    """`parsed` if it is a list of {"question", "answer"} dicts, otherwise None."""
+    if not isinstance(parsed, list):
+        return None
+    if not all(isinstance(qa, dict) and "question" in qa and "answer" in qa for qa in parsed):
+        return None
+    return parsed
 
 
 def parse_flashcards_from_response(content: str):
+    """The Q/A pairs in a reply, or None when it holds no usable JSON array."""
     try:
-        return json.loads(content)
+        return valid_qa_pairs(json.loads(content))
     except json.JSONDecodeError:
-        start, end = content.find("["), content.rfind("]") + 1
-        if start != -1 and end != -1:
+        start, end = content.find("["), content.rfind("]")
+        if start != -1 and end > start:
             try:
-                return json.loads(content[start:end])
-            except Exception:
-                return []
-    return []
+                return valid_qa_pairs(json.loads(content[start:end + 1]))
+            except json.JSONDecodeError:
+                return None
+    return None
+
 
+# Bump whenever the prompt below changes so cached responses aren't reused
+PROMPT_VERSION = "1"
+# Whole-document results in ingest_cache are only reused while all of these match
+GENERATION_KEY = f"{GEMINI_MODEL}:{PROMPT_VERSION}:{CHUNK_UNIT}:{CHUNK_BUDGET}:{CHUNK_OVERLAP}"
 
-def generate_flashcards_from_chunk(chunk: str):
+
+async def _request_flashcards(chunk: str):
     if not GEMINI_API_KEY:
-        # In local dev, allow running without external API by returning empty
-        return []
+        # In local dev, allow running without external API by returning no cards
+        return None
 
     headers = {"Content-Type": "application/json"}
     prompt = f"""
@@ -87,27 +208,201 @@ def generate_flashcards_from_chunk(chunk: str):
     data = {"contents": [{"parts": [{"text": prompt}]}]}
 
     try:
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}", headers=headers, json=data, timeout=30
+        response = await _get_http_client().post(
+            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}", headers=headers, json=data
         )
         response.raise_for_status()
         result = response.json()
         content = result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
         return parse_flashcards_from_response(content)
     except Exception:
-        return []
+        return None
 
 
-async def process_file(file: UploadFile, user_id: int, db: Session):
-    text = _extract_text_sync(file)
-    chunks = chunk_text(text)
+async def generate_flashcards_from_chunk(chunk: str, stats: CacheStats = None):
+    """Returns the Q/A pairs for a chunk, or None when no answer could be obtained.
 
-    all_flashcards = []
-    for chunk in chunks:
-        qa_pairs = generate_flashcards_from_chunk(chunk)
-        for qa in qa_pairs:
-            if "question" in qa and "answer" in qa:
-                flashcard = crud.create_flashcard(db, schemas.FlashcardCreate(**qa), user_id)
-                all_flashcards.append(flashcard)
+    Responses are cached per (normalized chunk, PROMPT_VERSION, GEMINI_MODEL);
+    lookups are counted on `stats` as well as the cache's global counters.
+    """
+    key = make_key(chunk, PROMPT_VERSION, GEMINI_MODEL)
+    cached = await run_in_threadpool(chunk_cache.get, key, stats)
+    if cached is not None:
+        return cached
 
+    # Refusals, empty or unparseable replies come back as None and are never cached
+    qa_pairs = valid_qa_pairs(await _request_flashcards(chunk))
+    if qa_pairs is not None:
+        await run_in_threadpool(chunk_cache.put, key, qa_pairs)
+    return qa_pairs
+
+
+async def iter_flashcards_for_chunks(chunks, concurrency: int = None, stats: CacheStats = None):
+    """Generates flashcards for chunks concurrently, yielding results in chunk order.
+
+    `chunks` may be a list or an async stream; generation starts as soon as
+    each chunk arrives. At most `concurrency` requests are in flight at once.
+    Closing the generator early cancels the requests that haven't finished.
+    """
+    concurrency = concurrency or GEMINI_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+    # Bounded so a fast extractor can't queue up the whole document ahead of generation
+    started = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def generate(chunk):
+        async with semaphore:
+            return await generate_flashcards_from_chunk(chunk, stats)
+
+    async def feed():
+        try:
+            if hasattr(chunks, "__aiter__"):
+                async for chunk in chunks:
+                    await started.put(asyncio.create_task(generate(chunk)))
+            else:
+                for chunk in chunks:
+                    await started.put(asyncio.create_task(generate(chunk)))
+        except Exception:
+            await started.put(None)
+            raise
+        await started.put(None)
+
+    feeder = asyncio.create_task(feed())
+    task = None
+    try:
+        while (task := await started.get()) is not None:
+            yield await task
+        # Surface extraction errors raised while feeding
+        await feeder
+    finally:
+        feeder.cancel()
+        if task is not None:
+            task.cancel()
+        while not started.empty():
+            task = started.get_nowait()
+            if task is not None:
+                task.cancel()
+
+
+def save_flashcards(db: Session, qa_pairs, user_id: int, job_id: int = None, **progress):
+    cards = [
+        schemas.FlashcardCreate(**qa) for qa in qa_pairs or []
+        if "question" in qa and "answer" in qa
+    ]
+    if job_id is not None:
+        return crud.save_ingest_chunk(db, job_id, cards, user_id, **progress)
+    return crud.create_flashcards(db, cards, user_id)
+
+
+def _store_extracted_text(content_hash: str, text: str):
+    # Own session: this runs while the caller's session is busy saving cards
+    db = SessionLocal()
+    try:
+        crud.store_ingest_cache(db, content_hash, text)
+    except Exception:
+        # The cache is an optimisation, never fail the upload over it
+        logger.exception("Could not cache the extracted text of %s", content_hash)
+    finally:
+        db.close()
+
+
+async def _iter_and_cache_text(content_hash: str, pieces):
+    collected = []
+    async for piece in pieces:
+        collected.append(piece)
+        yield piece
+    # Keep the extraction even if generation later fails part-way
+    await run_in_threadpool(_store_extracted_text, content_hash, " ".join(collected))
+
+
+async def load_document(db: Session, filename: str, contents: bytes):
+    """Returns (content_hash, chunks, cached_results) for an upload.
+
+    cached_results holds the per-chunk Q/A pairs of an earlier completed ingest
+    of the same bytes with the same GENERATION_KEY; otherwise it is None and
+    `chunks` is an async stream of chunks, produced while the document is
+    still being extracted (or read back from the cached extraction).
+    """
+    content_hash = hashlib.sha256(contents).hexdigest()
+    entry = await run_in_threadpool(crud.get_ingest_cache, db, content_hash)
+    if entry and entry.qa_pairs and entry.generation_key == GENERATION_KEY:
+        return content_hash, None, json.loads(entry.qa_pairs)
+
+    if entry:
+        pieces = iter_cached_results([entry.extracted_text])
+    else:
+        pieces = _iter_and_cache_text(content_hash, iter_document_text(filename, contents))
+    return content_hash, aiter_chunks(pieces, CHUNK_BUDGET, CHUNK_UNIT, CHUNK_OVERLAP), None
+
+
+async def store_document_results(db: Session, content_hash: str, results):
+    """Caches a finished ingest, unless some chunk failed to generate."""
+    if any(qa_pairs is None for qa_pairs in results):
+        return
+    try:
+        await run_in_threadpool(crud.store_ingest_cache, db, content_hash, None, results, GENERATION_KEY)
+        await run_in_threadpool(
+            crud.evict_ingest_cache, db, INGEST_CACHE_MAX_MB * 1024 * 1024, INGEST_CACHE_MAX_AGE_DAYS
+        )
+    except Exception:
+        # The cards are already saved; a failed cache write must not fail the upload
+        logger.exception("Could not cache the results of %s", content_hash)
+        await run_in_threadpool(db.rollback)
+
+
+async def iter_cached_results(results):
+    for qa_pairs in results:
+        yield qa_pairs
+
+
+async def iter_process_file(
+    filename: str, contents: bytes, user_id: int, db: Session, stats: CacheStats = None,
+    skip: int = 0, job_id: int = None,
+):
+    """Runs the upload pipeline, yielding after each chunk's cards are saved.
+
+    Yields (chunks_done, chunks_seen, cards); chunks_seen grows while the
+    document is still being extracted. The first `skip` chunks are passed
+    over, which lets an interrupted job resume. With job_id, each chunk's
+    cards are committed together with the job's progress.
+    """
+    content_hash, chunks, cached = await load_document(db, filename, contents)
+    seen = [0]
+    if cached is not None:
+        seen[0] = len(cached)
+        results = iter_cached_results(cached[skip:])
+    else:
+        results = iter_flashcards_for_chunks(_count_and_skip(chunks, skip, seen), stats=stats)
+
+    done, generated = skip, []
+    try:
+        async for qa_pairs in results:
+            generated.append(qa_pairs)
+            done += 1
+            progress = {}
+            if job_id is not None:
+                progress = dict(job_id=job_id, chunks_done=done, chunks_total=max(seen[0], done))
+                if stats:
+                    progress.update(llm_cache_hits=stats.hits, llm_cache_misses=stats.misses)
+            # Session work is blocking, keep it on the threadpool
+            cards = await run_in_threadpool(save_flashcards, db, qa_pairs, user_id, **progress)
+            yield done, max(seen[0], done), cards
+    finally:
+        await results.aclose()
+
+    # Only a run that generated every chunk itself has the full result set to cache
+    if cached is None and skip == 0:
+        await store_document_results(db, content_hash, generated)
+
+
+async def _count_and_skip(chunks, skip: int, seen: list):
+    async for chunk in chunks:
+        seen[0] += 1
+        if seen[0] > skip:
+            yield chunk
+
+
+async def process_file(file: UploadFile, user_id: int, db: Session, stats: CacheStats = None):
+    all_flashcards = []
+    async for _, _, cards in iter_process_file(file.filename, await file.read(), user_id, db, stats):
+        all_flashcards.extend(cards)
     return all_flashcards
@@ -0,0 +1,171 @@
+# backend/utils/jobs.py
+import os
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from starlette.concurrency import run_in_threadpool
+from .. import crud
+from ..database import SessionLocal
+from . import flashcards as flashcard_service
+from .llm_cache import CacheStats
+
+JOB_UPLOAD_DIR = os.path.join("uploads", "jobs")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_MAX_QUEUED = int(os.getenv("INGEST_MAX_QUEUED", "100"))
+# Idle workers also re-check the table this often, to pick up jobs queued elsewhere
+INGEST_POLL_SECONDS = float(os.getenv("INGEST_POLL_SECONDS", "5"))
+# Each process refreshes updated_at on the jobs it runs this often; running jobs
+# with no refresh for INGEST_STALE_SECONDS were left by a dead process and get requeued
+INGEST_HEARTBEAT_SECONDS = float(os.getenv("INGEST_HEARTBEAT_SECONDS", "30"))
+INGEST_STALE_SECONDS = float(os.getenv("INGEST_STALE_SECONDS", "120"))
+
+_wakeup: asyncio.Event | None = None
+_workers: list[asyncio.Task] = []
+_running: dict[int, asyncio.Task] = {}
+_cancel_requested: set[int] = set()
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _db_call(fn, *args, **kwargs):
+    """Runs one crud call in its own session (called on the threadpool)."""
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def _store_upload(filename: str, contents: bytes) -> str:
+    os.makedirs(JOB_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(JOB_UPLOAD_DIR, f"{uuid.uuid4().hex}_{os.path.basename(filename)}")
+    with open(path, "wb") as f:
+        f.write(contents)
+    return path
+
+
+def _read_upload(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _remove_upload(path: str):
+    try:
+        os.remove(path)
+    except Exception:
+        pass
+
+
+async def submit(filename: str, contents: bytes, user_id: int):
+    """Stores the upload and queues an ingest job for it."""
+    if await run_in_threadpool(_db_call, crud.count_queued_ingest_jobs) >= INGEST_MAX_QUEUED:
+        raise QueueFullError("Ingest queue is full, try again later")
+    path = await run_in_threadpool(_store_upload, filename, contents)
+    job = await run_in_threadpool(_db_call, crud.create_ingest_job, user_id, filename, path)
+    if _wakeup:
+        _wakeup.set()
+    return job
+
+
+async def cancel(job_id: int):
+    job = await run_in_threadpool(_db_call, crud.cancel_ingest_job, job_id)
+    # Interrupt right away if this process is the one running it; other
+    # processes notice the status change before their next chunk
+    task = _running.get(job_id)
+    if task and job and job.status == "cancelled":
+        _cancel_requested.add(job_id)
+        task.cancel()
+    return job
+
+
+async def _run_job(job):
+    db = SessionLocal()
+    try:
+        contents = await run_in_threadpool(_read_upload, job.file_path)
+
+        # Resume after the last finished chunk if the job was interrupted by a restart.
+        # The pipeline saves each chunk's cards and the job's progress in one commit.
+        done = job.chunks_done
+        stats = CacheStats()
+        stats.misses, stats.memory_hits = job.llm_cache_misses or 0, job.llm_cache_hits or 0
+        pipeline = flashcard_service.iter_process_file(
+            job.filename, contents, job.user_id, db, stats, skip=done, job_id=job.id
+        )
+        try:
+            async for done, seen, cards in pipeline:
+                if await run_in_threadpool(crud.get_ingest_job_status, db, job.id) != "running":
+                    break
+            else:
+                await run_in_threadpool(crud.update_ingest_job, db, job.id, chunks_total=done)
+                await run_in_threadpool(crud.finish_ingest_job, db, job.id, "completed")
+        finally:
+            await pipeline.aclose()
+    except asyncio.CancelledError:
+        if job.id not in _cancel_requested:
+            # Shutting down: leave the job running so it is requeued once its heartbeat goes stale
+            raise
+        # Cancelled by the user: clear the request so the cleanup below can still await
+        asyncio.current_task().uncancel()
+    except Exception as e:
+        await run_in_threadpool(crud.finish_ingest_job, db, job.id, "failed", str(e))
+    finally:
+        _cancel_requested.discard(job.id)
+        db.close()
+
+    await run_in_threadpool(_remove_upload, job.file_path)
+
+
+async def _worker():
+    while True:
+        job = await run_in_threadpool(_db_call, crud.claim_next_ingest_job)
+        if not job:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=INGEST_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        task = asyncio.create_task(_run_job(job))
+        _running[job.id] = task
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # The job was cancelled (task finishes on its own) or the worker is stopping
+            if not task.done():
+                task.cancel()
+                raise
+        finally:
+            _running.pop(job.id, None)
+
+
+async def _heartbeat():
+    # Safe with several worker processes: a job is only requeued when no
+    # process has touched it for INGEST_STALE_SECONDS
+    while True:
+        try:
+            await run_in_threadpool(_db_call, crud.touch_ingest_jobs, list(_running))
+            stale_before = datetime.utcnow() - timedelta(seconds=INGEST_STALE_SECONDS)
+            if await run_in_threadpool(_db_call, crud.requeue_interrupted_ingest_jobs, stale_before):
+                _wakeup.set()
+        except Exception:
+            pass  # database briefly unavailable, try again next beat
+        await asyncio.sleep(INGEST_HEARTBEAT_SECONDS)
+
+
+async def start():
+    """Starts the worker pool and the heartbeat that recovers interrupted jobs."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    _workers.append(asyncio.create_task(_heartbeat()))
+    for _ in range(INGEST_WORKERS):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
@@ -0,0 +1,119 @@
+# backend/utils/llm_cache.py
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "2048"))
+
+
+def make_key(chunk: str, prompt_version: str, model: str) -> str:
+    """Cache key for a chunk; whitespace differences don't produce new keys."""
+    normalized = re.sub(r"\s+", " ", chunk).strip()
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"{model}:{prompt_version}:{digest}"
+
+
+class CacheStats:
+    """Hit/miss counters, kept globally and per upload."""
+
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class ChunkResponseCache:
+    """Bounded in-memory LRU in front of a SQLite file.
+
+    Lookups may touch the disk, so call get/put from a worker thread.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_memory_entries: int = LLM_CACHE_MEMORY_ENTRIES):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.stats = CacheStats()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._schema_ready = True
+        return conn
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, stats, field):
+        with self._lock:
+            for c in (self.stats, stats):
+                if c is not None:
+                    setattr(c, field, getattr(c, field) + 1)
+
+    def get(self, key: str, stats: CacheStats = None):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+        if value is not None:
+            self._count(stats, "memory_hits")
+            return value
+
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM chunk_responses WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            self._count(stats, "misses")
+            return None
+
+        value = json.loads(row[0])
+        self._remember(key, value)
+        self._count(stats, "disk_hits")
+        return value
+
+    def put(self, key: str, value):
+        self._remember(key, value)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO chunk_responses (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time()),
+                )
+        finally:
+            conn.close()
+
+
+chunk_cache = ChunkResponseCache()
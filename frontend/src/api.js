@@ -14,11 +14,82 @@ export async function uploadFile(file, userId) {
   return response.json();
 }
 
-export async function getFlashcards(userId) {
-  const response = await fetch(`${API_BASE}/flashcards/${userId}`);
+// Streaming upload: calls onEvent for each NDJSON event ("flashcards", "progress",
+// "done" or "error") as soon as the backend finishes a chunk
+export async function uploadFileStream(file, userId, onEvent) {
+  const formData = new FormData();
+  formData.append("file", file);
+  formData.append("user_id", userId);
+
+  const response = await fetch(`${API_BASE}/upload/stream`, {
+    method: "POST",
+    body: formData,
+  });
+  if (!response.ok) {
+    throw new Error(`API request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop();
+    lines.filter((line) => line.trim()).forEach((line) => onEvent(JSON.parse(line)));
+  }
+  if (buffered.trim()) {
+    onEvent(JSON.parse(buffered));
+  }
+}
+
+// Background upload: returns the ingest job right away, poll getUploadJob for progress
+export async function uploadFileAsJob(file, userId) {
+  const formData = new FormData();
+  formData.append("file", file);
+  formData.append("user_id", userId);
+
+  const response = await fetch(`${API_BASE}/jobs/`, {
+    method: "POST",
+    body: formData,
+  });
+  if (!response.ok) {
+    throw new Error(`API request failed with status ${response.status}`);
+  }
   return response.json();
 }
 
+export async function getUploadJob(jobId) {
+  const response = await fetch(`${API_BASE}/jobs/${jobId}`);
+  return response.json();
+}
+
+export async function cancelUploadJob(jobId) {
+  const response = await fetch(`${API_BASE}/jobs/${jobId}/cancel`, {
+    method: "POST",
+  });
+  return response.json();
+}
+
+// Paged list endpoints: resolve to { items, nextCursor }; pass nextCursor back
+// for the following page, it is null on the last one
+async function getPage(path, { cursor, limit } = {}) {
+  const params = new URLSearchParams();
+  if (cursor) params.set("cursor", cursor);
+  if (limit) params.set("limit", limit);
+  const response = await fetch(`${API_BASE}${path}?${params}`);
+  if (!response.ok) {
+    throw new Error(`API request failed with status ${response.status}`);
+  }
+  return { items: await response.json(), nextCursor: response.headers.get("X-Next-Cursor") };
+}
+
+export async function getFlashcards(userId, page) {
+  return getPage(`/flashcards/${userId}`, page);
+}
+
 export async function submitReview(userId, flashcardId, correct) {
   const response = await fetch(`${API_BASE}/review/`, {
     method: "POST",
@@ -28,16 +99,58 @@ export async function submitReview(userId, flashcardId, correct) {
   return response.json();
 }
 
-export async function getHistory(userId) {
-  const response = await fetch(`${API_BASE}/history/${userId}`);
+// reviews: [{ flashcard_id, correct }, ...] recorded in one request and one
+// transaction. keepalive lets the request finish while the page unloads.
+export async function submitReviews(userId, reviews, { keepalive = false } = {}) {
+  const response = await fetch(`${API_BASE}/review/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ user_id: userId, reviews }),
+    keepalive,
+  });
+  if (!response.ok) {
+    // The caller retries on server errors only, and a 404 names the cards it rejected
+    const error = new Error(`API request failed with status ${response.status}`);
+    error.status = response.status;
+    error.detail = (await response.json().catch(() => ({}))).detail;
+    throw error;
+  }
+  return response.json();
+}
+
+// Newest reviews first
+export async function getHistory(userId, page) {
+  return getPage(`/history/${userId}`, page);
+}
+
+// Per-user counters (cards per box, mastered, total/correct reviews, streak)
+export async function getStats(userId) {
+  const response = await fetch(`${API_BASE}/stats/${userId}`);
+  if (!response.ok) {
+    throw new Error(`API request failed with status ${response.status}`);
+  }
+  return response.json();
+}
+
+// Correct/wrong review counts per "day" or "week" over the last `days` days
+export async function getProgress(userId, { days = 30, bucket = "day" } = {}) {
+  const end = new Date();
+  const start = new Date(end.getTime() - (days - 1) * 24 * 60 * 60 * 1000);
+  const params = new URLSearchParams({
+    start: start.toISOString().slice(0, 10),
+    end: end.toISOString().slice(0, 10),
+    bucket,
+  });
+  const response = await fetch(`${API_BASE}/progress/${userId}?${params}`);
   if (!response.ok) {
     throw new Error(`API request failed with status ${response.status}`);
   }
   return response.json();
 }
 
+// Counters, streak and holiday only; the raw history isn't needed here
 export async function getDashboard(userId) {
-  const response = await fetch(`${API_BASE}/dashboard/${userId}`);
+  const response = await fetch(`${API_BASE}/dashboard/${userId}?lean=true`);
   return response.json();
 }
 
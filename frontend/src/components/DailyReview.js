@@ -72,8 +72,8 @@
 // }
 
 // frontend/src/components/DailyReview.js
-import React, { useEffect, useState } from "react";
-import { getDailyReview, submitReview } from "../api";
+import React, { useCallback, useEffect, useRef, useState } from "react";
+import { getDailyReview, submitReviews } from "../api";
 
 export default function DailyReview({ user }) {
   const [todayCards, setTodayCards] = useState([]);
@@ -81,6 +81,30 @@ export default function DailyReview({ user }) {
   const [current, setCurrent] = useState(0);
   const [showAnswer, setShowAnswer] = useState(false);
   const [mode, setMode] = useState("today"); // today or catchup
+  const [error, setError] = useState(null);
+  // Answers are sent in one batch per session part instead of one request per card
+  const pending = useRef([]);
+
+  const flushReviews = useCallback((options) => {
+    const reviews = pending.current;
+    if (!user?.id || reviews.length === 0) return;
+    pending.current = [];
+    submitReviews(user.id, reviews, options).catch((err) => {
+      console.error(err);
+      if (!err.status || err.status >= 500) {
+        pending.current = reviews.concat(pending.current); // retried with the next flush
+        return;
+      }
+      // Rejected by the server, so sending it again would fail the same way.
+      // A 404 lists cards that no longer exist; the rest of the batch is still good.
+      const rejected = err.status === 404 ? err.detail?.flashcard_ids : null;
+      if (rejected) {
+        const kept = reviews.filter((r) => !rejected.includes(r.flashcard_id));
+        pending.current = kept.concat(pending.current);
+      }
+      setError("Some answers could not be saved.");
+    });
+  }, [user]);
 
   useEffect(() => {
     async function fetchCards() {
@@ -91,12 +115,23 @@ export default function DailyReview({ user }) {
     fetchCards();
   }, [user]);
 
+  // Don't lose answers when the user leaves mid-session
+  useEffect(() => {
+    const onPageHide = () => flushReviews({ keepalive: true });
+    window.addEventListener("pagehide", onPageHide);
+    return () => {
+      window.removeEventListener("pagehide", onPageHide);
+      flushReviews({ keepalive: true });
+    };
+  }, [flushReviews]);
+
   const cards = mode === "today" ? todayCards : catchupCards;
 
   if (cards.length === 0 && mode === "today" && catchupCards.length > 0) {
     return (
       <div className="text-center mt-6">
         <p className="mb-4">✅ Today’s session complete!</p>
+        {error && <p className="mb-4 text-sm text-red-600">{error}</p>}
         <button
           onClick={() => { setMode("catchup"); setCurrent(0); }}
           className="px-4 py-2 bg-orange-600 text-white rounded-lg hover:bg-orange-700"
@@ -109,20 +144,22 @@ export default function DailyReview({ user }) {
 
   if (cards.length === 0) {
     return (
-      <p className="text-center mt-6 text-green-600 font-bold">
-        🎉 All reviews done! Come back tomorrow.
-      </p>
+      <div className="text-center mt-6">
+        <p className="text-green-600 font-bold">🎉 All reviews done! Come back tomorrow.</p>
+        {error && <p className="mt-2 text-sm text-red-600">{error}</p>}
+      </div>
     );
   }
 
   const card = cards[current];
 
-  const handleAnswer = async (correct) => {
-    await submitReview(user.id, card.id, correct);
+  const handleAnswer = (correct) => {
+    pending.current.push({ flashcard_id: card.id, correct });
     if (current + 1 < cards.length) {
       setCurrent(current + 1);
       setShowAnswer(false);
     } else {
+      flushReviews();
       if (mode === "today" && catchupCards.length > 0) {
         setMode("catchup");
         setCurrent(0);
@@ -140,6 +177,7 @@ export default function DailyReview({ user }) {
         {current + 1} / {cards.length}
       </h3>
       <p className="text-lg">{showAnswer ? card.answer : card.question}</p>
+      {error && <p className="mt-2 text-sm text-red-600">{error}</p>}
 
       <div className="flex justify-between mt-6">
         <button
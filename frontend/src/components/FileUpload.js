@@ -1,17 +1,37 @@
 // frontend/src/components/FileUpload.js
 import React, { useState } from "react";
-import { uploadFile } from "../api";
+import { uploadFileStream } from "../api";
 
 export default function FileUpload({ user, onFlashcardsGenerated }) {
   const [file, setFile] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [progress, setProgress] = useState(null);
+  const [error, setError] = useState(null);
 
   const handleUpload = async () => {
     if (!file) return;
     setLoading(true);
-    const result = await uploadFile(file, user.id);
-    onFlashcardsGenerated(result.flashcards || []);
-    setLoading(false);
+    setProgress(null);
+    setError(null);
+    // Show cards as each chunk finishes instead of waiting for the whole document
+    let cards = [];
+    try {
+      await uploadFileStream(file, user.id, (event) => {
+        if (event.type === "flashcards") {
+          cards = cards.concat(event.flashcards);
+          onFlashcardsGenerated(cards);
+        } else if (event.type === "progress") {
+          setProgress(event);
+        } else if (event.type === "error") {
+          setError(event.detail);
+        }
+      });
+    } catch (err) {
+      setError("Upload failed. Please try again.");
+      console.error(err);
+    } finally {
+      setLoading(false);
+    }
   };
 
   return (
@@ -27,6 +47,12 @@ export default function FileUpload({ user, onFlashcardsGenerated }) {
       >
         {loading ? "Processing..." : "Upload & Generate Flashcards"}
       </button>
+      {progress && (
+        <p className="mt-2 text-sm text-gray-600">
+          {progress.chunks_done} / {progress.chunks_total} sections processed, {progress.cards_created} cards
+        </p>
+      )}
+      {error && <p className="mt-2 text-sm text-red-600">{error}</p>}
     </div>
   );
 }
@@ -1,57 +1,48 @@
 // frontend/src/components/ProgressDashboard.js
 import React, { useEffect, useState, useMemo } from "react";
-import { getHistory } from "../api";
+import { getProgress, getStats } from "../api";
 import {
   PieChart, Pie, Cell, Tooltip, Legend,
   LineChart, Line, XAxis, YAxis, CartesianGrid, ResponsiveContainer
 } from "recharts";
 
 const COLORS = ["#10B981", "#EF4444"]; // Green-500, Red-500
+const TIMELINE_DAYS = 90;
 
-const processChartData = (history) => {
-  // --- Data for Pie Chart ---
-  const correctCount = history.filter((h) => h.correct).length;
-  const wrongCount = history.length - correctCount;
+const processChartData = (progress, stats) => {
+  // --- Data for Pie Chart (counters kept by the backend) ---
+  const correctCount = stats?.correct_reviews ?? 0;
+  const wrongCount = (stats?.total_reviews ?? 0) - correctCount;
   const pieData = [
     { name: "Correct", value: correctCount },
     { name: "Wrong", value: wrongCount },
   ];
 
-  // --- Data for Timeline (accuracy per day) ---
-  const groupedByDate = history.reduce((acc, item) => {
-    // Use a consistent, sortable date format (YYYY-MM-DD)
-    const date = new Date(item.reviewed_at).toISOString().split('T')[0];
-    if (!acc[date]) {
-      acc[date] = { total: 0, correct: 0 };
-    }
-    acc[date].total++;
-    if (item.correct) {
-      acc[date].correct++;
-    }
-    return acc;
-  }, {});
+  // --- Data for Timeline (accuracy per day, grouped by the backend) ---
+  const lineData = (progress?.buckets || []).map((b) => ({
+    date: b.start,
+    accuracy: (b.correct / b.total) * 100,
+  }));
 
-  const lineData = Object.keys(groupedByDate)
-    .map(date => ({
-      date,
-      accuracy: (groupedByDate[date].correct / groupedByDate[date].total) * 100,
-    }))
-    .sort((a, b) => new Date(a.date) - new Date(b.date));
-    
   return { pieData, lineData };
 };
 
 export default function ProgressDashboard({ user }) {
-  const [history, setHistory] = useState([]);
+  const [progress, setProgress] = useState(null);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    async function fetchHistory() {
+    async function fetchProgress() {
       try {
         setLoading(true);
-        const data = await getHistory(user.id);
-        setHistory(data);
+        const [progressData, statsData] = await Promise.all([
+          getProgress(user.id, { days: TIMELINE_DAYS }),
+          getStats(user.id),
+        ]);
+        setProgress(progressData);
+        setStats(statsData);
         setError(null);
       } catch (err) {
         setError("Failed to load study history. Please try again later.");
@@ -61,11 +52,11 @@ export default function ProgressDashboard({ user }) {
       }
     }
     if (user?.id) {
-      fetchHistory();
+      fetchProgress();
     }
   }, [user]);
 
-  const { pieData, lineData } = useMemo(() => processChartData(history), [history]);
+  const { pieData, lineData } = useMemo(() => processChartData(progress, stats), [progress, stats]);
 
   if (loading) {
     return <p className="text-gray-600 text-center mt-6">Loading progress...</p>;
@@ -75,7 +66,7 @@ export default function ProgressDashboard({ user }) {
     return <p className="text-red-600 text-center mt-6">{error}</p>;
   }
 
-  if (!history || history.length === 0) {
+  if (!stats || stats.total_reviews === 0) {
     return <p className="text-gray-600 text-center mt-6">No study history yet. Complete a review to see your progress!</p>;
   }
 
@@ -0,0 +1,23 @@
+# gunicorn.conf.py
+# Production launch: gunicorn -c gunicorn.conf.py backend.main:app
+# Run migrations first (alembic upgrade head), the app no longer creates tables on import.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# One worker per CPU unless WEB_CONCURRENCY says otherwise
+workers = int(os.getenv("WEB_CONCURRENCY") or os.cpu_count() or 1)
+worker_class = "uvicorn_worker.UvicornWorker"
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+accesslog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # Connections opened by the master must not be shared with the children
+    from backend.database import async_engine, engine
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,59 @@
+"""Compare per-card inserts with the bulk create_flashcards path.
+
+Usage (from the repo root):
+    python scripts/bench_bulk_insert.py [--database-url sqlite:///./bench.db]
+
+Without --database-url a throwaway SQLite file in a temp directory is used.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--sizes", default="10,100,1000")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    # Imported after DATABASE_URL is set, the engine is created at import time
+    from backend import crud, schemas
+    from backend.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    print(f"{'cards':>6} {'per-card (ms)':>14} {'bulk (ms)':>10} {'speedup':>8}")
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            cards = [schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}") for i in range(size)]
+
+            start = time.perf_counter()
+            for card in cards:
+                crud.create_flashcard(db, card, 1)
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            crud.create_flashcards(db, cards, 2)
+            bulk = time.perf_counter() - start
+
+            print(f"{size:>6} {single * 1000:>14.1f} {bulk * 1000:>10.1f} {single / bulk:>7.1f}x")
+    finally:
+        db.close()
+        engine.dispose()
+        if tmpdir:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark the chunking engine against the two chunkers it replaced.
+
+Usage (from the repo root):
+    python scripts/bench_chunking.py [--mb 1,4,16]
+
+Inputs are synthetic prose of the given sizes in MB.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.chunking import chunk_text, iter_chunks  # noqa: E402
+
+
+def legacy_word_chunks(text, chunk_size=300, overlap=50):
+    # Former backend/utils/chunking.chunk_text
+    words = re.split(r"\s+", text)
+    chunks, i = [], 0
+    while i < len(words):
+        chunks.append(" ".join(words[i:i + chunk_size]))
+        i += chunk_size - overlap
+    return chunks
+
+
+def legacy_sentence_chunks(text, max_chars=2000):
+    # Former backend/utils/flashcards.chunk_text
+    sentences = text.split(". ")
+    chunks, current = [], ""
+    for sentence in sentences:
+        if len(current) + len(sentence) < max_chars:
+            current += sentence + ". "
+        else:
+            if current:
+                chunks.append(current.strip())
+            current = sentence + ". "
+    if current:
+        chunks.append(current.strip())
+    return chunks
+
+
+def make_text(size_bytes, seed=0):
+    rng = random.Random(seed)
+    vocab = [w for w in "the of and to in is that for it as with was on be by this are from at or an".split()]
+    vocab += ["mitochondria", "photosynthesis", "equilibrium", "derivative", "Leitner", "semester"]
+    sentences, size = [], 0
+    while size < size_bytes:
+        sentence = " ".join(rng.choice(vocab) for _ in range(rng.randint(4, 30))).capitalize() + "."
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", default="1,4,16")
+    args = parser.parse_args()
+
+    cases = [
+        ("legacy words (300/50)", legacy_word_chunks),
+        ("engine words (300/50)", chunk_text),
+        ("legacy sentences (2000 chars)", legacy_sentence_chunks),
+        ("engine sentences (2000 chars)", lambda text: list(iter_chunks([text], 2000, "chars"))),
+        ("engine sentences, 2 KB pieces", lambda text: list(iter_chunks(
+            (text[i:i + 2048] for i in range(0, len(text), 2048)), 2000, "chars"))),
+        ("engine tokens (512/64)", lambda text: list(iter_chunks([text], 512, "tokens", 64))),
+    ]
+    for mb in (float(m) for m in args.mb.split(",")):
+        text = make_text(int(mb * 1024 * 1024))
+        print(f"\n{mb:g} MB input")
+        for name, fn in cases:
+            seconds, count = timed(fn, text)
+            print(f"  {name:<32} {seconds * 1000:>9.1f} ms {count:>7} chunks {mb / seconds:>7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare loading the whole deck for /daily/ with the queries /daily/ runs now.
+
+Usage (from the repo root):
+    python scripts/bench_daily_cards.py [--database-url sqlite:///./bench.db] [--sizes 100,1000,10000,20000]
+
+Without --database-url a throwaway SQLite file in a temp directory is used.
+Each deck size gets its own user; times are the median of --repeat runs.
+"rebuild" is get_daily_queues, which builds a user's queue once per day and
+queue version; "stored" is get_stored_daily_queues serving that stored queue,
+which is what most /daily/ requests do.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def legacy_daily_cards(db, models, user_id, limit=20):
+    # Former crud.get_daily_cards
+    today = date.today()
+    flashcards = db.query(models.Flashcard).filter(models.Flashcard.user_id == user_id).all()
+    eligible = []
+    for card in flashcards:
+        if card.box == 1:
+            eligible.append(card)
+        elif card.box == 2 and today.toordinal() % 2 == 0:
+            eligible.append(card)
+        elif card.box == 3 and today.toordinal() % 3 == 0:
+            eligible.append(card)
+    random.shuffle(eligible)
+    return eligible[:limit]
+
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--sizes", default="100,1000,10000,20000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    # Imported after DATABASE_URL is set, the engine is created at import time
+    from backend import crud, models
+    from backend.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    rng = random.Random(0)
+    print(f"{'cards':>7} {'load all (ms)':>14} {'rebuild (ms)':>13} {'stored (ms)':>12} {'speedup':>8}")
+    try:
+        for user_id, size in enumerate((int(s) for s in args.sizes.split(",")), start=1000):
+            db.execute(models.Flashcard.__table__.insert(), [
+                {"question": f"Q{i}", "answer": f"A{i}", "user_id": user_id, "box": rng.choice((1, 2, 3))}
+                for i in range(size)
+            ])
+            db.commit()
+
+            # Rolling back ends each call's request: it drops the memoized lookups and loaded cards
+            def fresh(fn, *fn_args):
+                return lambda: (fn(db, user_id, *fn_args), db.rollback(), db.expunge_all())
+
+            legacy = median_ms(fresh(lambda db, user_id: legacy_daily_cards(db, models, user_id)), args.repeat)
+            rebuild = median_ms(fresh(crud.get_daily_queues), args.repeat)
+            version = crud.get_queue_version(db, user_id)
+            crud.get_stored_daily_queues(db, user_id, version)
+            db.expunge_all()
+            stored = median_ms(fresh(crud.get_stored_daily_queues, version), args.repeat)
+            print(f"{size:>7} {legacy:>14.2f} {rebuild:>13.2f} {stored:>12.2f} {legacy / stored:>7.1f}x")
+    finally:
+        db.close()
+        engine.dispose()
+        if tmpdir:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
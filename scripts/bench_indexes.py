@@ -0,0 +1,133 @@
+"""EXPLAIN and time the hot per-user queries before and after the 0004 indexes.
+
+Usage (from the repo root):
+    python scripts/bench_indexes.py [--database-url sqlite:///./bench.db] [--users 500]
+
+Without --database-url a throwaway SQLite file in a temp directory is used.
+The database is migrated to 0003, seeded, measured, then upgraded to head
+and measured again. Point --database-url only at a scratch database.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUERIES = {
+    "daily queue": (
+        "SELECT id FROM flashcards WHERE user_id = :user_id AND next_due <= :today "
+        "ORDER BY next_due, id LIMIT 20"
+    ),
+    "mastered count": "SELECT count(id) FROM flashcards WHERE user_id = :user_id AND box = 3",
+    "last study date": (
+        "SELECT timestamp FROM reviews WHERE user_id = :user_id ORDER BY timestamp DESC LIMIT 1"
+    ),
+    "history": "SELECT id, correct, timestamp FROM reviews WHERE user_id = :user_id",
+    "active holiday": (
+        "SELECT id FROM holidays WHERE user_id = :user_id "
+        "AND start_date <= :today AND end_date >= :today LIMIT 1"
+    ),
+}
+
+
+def seed(engine, models, users, cards, reviews, rng):
+    today = date.today()
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [{"id": u, "email": f"u{u}@example.com"} for u in range(1, users + 1)])
+        for u in range(1, users + 1):
+            conn.execute(models.Flashcard.__table__.insert(), [
+                {"question": "Q", "answer": "A", "user_id": u, "box": rng.randint(1, 3),
+                 "next_due": today + timedelta(days=rng.randint(-5, 5))}
+                for _ in range(cards)
+            ])
+            conn.execute(models.Review.__table__.insert(), [
+                {"user_id": u, "flashcard_id": 1, "correct": rng.randint(0, 1),
+                 "timestamp": datetime.utcnow() - timedelta(minutes=rng.randint(0, 60 * 24 * 365))}
+                for _ in range(reviews)
+            ])
+            conn.execute(models.Holiday.__table__.insert(), [
+                {"user_id": u, "start_date": today + timedelta(days=d), "end_date": today + timedelta(days=d + 7)}
+                for d in range(-60, 60, 30)
+            ])
+
+
+def explain(conn, sql, params):
+    from sqlalchemy import text
+
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params)]
+    return [row[0] for row in conn.execute(text("EXPLAIN " + sql), params)]
+
+
+def measure(engine, users, repeat, rng):
+    from sqlalchemy import text
+
+    results = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            params = {"user_id": rng.randint(1, users), "today": date.today()}
+            plan = explain(conn, sql, params)
+            times = []
+            for _ in range(repeat):
+                params["user_id"] = rng.randint(1, users)
+                start = time.perf_counter()
+                conn.execute(text(sql), params).all()
+                times.append(time.perf_counter() - start)
+            results[name] = (statistics.median(times) * 1000, plan)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--cards", type=int, default=200, help="flashcards per user")
+    parser.add_argument("--reviews", type=int, default=400, help="reviews per user")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    # Imported after DATABASE_URL is set, the engine is created at import time
+    from alembic import command
+    from alembic.config import Config
+    from backend import models
+    from backend.database import engine
+
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    rng = random.Random(0)
+    try:
+        command.upgrade(config, "0003")
+        print(f"Seeding {args.users} users x {args.cards} cards / {args.reviews} reviews...")
+        seed(engine, models, args.users, args.cards, args.reviews, rng)
+
+        before = measure(engine, args.users, args.repeat, random.Random(1))
+        command.upgrade(config, "head")
+        engine.dispose()  # fresh connections, so no statement prepared before the indexes is reused
+        after = measure(engine, args.users, args.repeat, random.Random(1))
+
+        print(f"\n{'query':<16} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+        for name in QUERIES:
+            print(f"{name:<16} {before[name][0]:>12.3f} {after[name][0]:>11.3f} {before[name][0] / after[name][0]:>7.1f}x")
+        for name in QUERIES:
+            print(f"\n{name}\n  before: {' | '.join(before[name][1])}\n  after:  {' | '.join(after[name][1])}")
+    finally:
+        engine.dispose()
+        if tmpdir:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Measure cold start: import time of the app and time to its first responses.
+
+Usage (from the repo root):
+    python scripts/bench_startup.py [--runs 5] [--import-budget-ms 1500] [--first-response-budget-ms 3000]
+
+Each run starts fresh interpreters against a throwaway SQLite database that
+is migrated up front (not timed). Reported times are medians over --runs.
+Exits with status 1 when a median is over its budget, or when importing the
+app loads a module that should only load once an upload needs it.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Document parsing and outbound HTTP are only needed once a file is uploaded
+LAZY_MODULES = ["httpx", "requests", "fitz", "docx", "pptx", "PyPDF2", "google.generativeai", "multiprocessing"]
+
+
+def import_profile(env):
+    """Milliseconds to import backend.main, its slowest imports and the lazy modules it loaded."""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import backend.main\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps([elapsed * 1000, [m for m in {LAZY_MODULES!r} if m in sys.modules]]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    elapsed, loaded = json.loads(result.stdout)
+    # Lines look like "import time:  self [us] | cumulative | indented.name"
+    top_level = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2].rstrip()
+            if name.startswith("   ") and not name.startswith("    "):
+                top_level.append((int(parts[1]) / 1000, name.strip()))
+    return elapsed, sorted(top_level, reverse=True)[:8], loaded
+
+
+def first_responses(env, port, paths):
+    """Milliseconds from process start to /health answering, then for each first request."""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            while True:
+                try:
+                    client.get("/health").raise_for_status()
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None or time.perf_counter() - start > 60:
+                        raise RuntimeError("server did not start")
+                    time.sleep(0.01)
+            times = {"/health": (time.perf_counter() - start) * 1000}
+            for path in paths:
+                request_start = time.perf_counter()
+                client.get(path).raise_for_status()
+                times[path] = (time.perf_counter() - request_start) * 1000
+            return times
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--first-response-budget-ms", type=float, default=3000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}", ASYNC_DB="0")
+    env.pop("GEMINI_API_KEY", None)
+    paths = ["/daily/1", "/dashboard/1?lean=true"]
+    try:
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT, env=env, check=True, capture_output=True)
+
+        imports, responses, loaded = [], [], set()
+        for _ in range(args.runs):
+            elapsed, slowest, lazy_loaded = import_profile(env)
+            imports.append(elapsed)
+            loaded.update(lazy_loaded)
+            responses.append(first_responses(env, args.port, paths))
+    finally:
+        tmpdir.cleanup()
+
+    import_ms = statistics.median(imports)
+    print(f"{'import backend.main':<32} {import_ms:>8.1f} ms (median of {args.runs})")
+    print("slowest top-level imports (last run, cumulative):")
+    for ms, name in slowest:
+        print(f"  {name:<30} {ms:>8.1f} ms")
+    first_ms = {path: statistics.median(run[path] for run in responses) for path in responses[0]}
+    for path, ms in first_ms.items():
+        label = "start to /health" if path == "/health" else f"first {path}"
+        print(f"{label:<32} {ms:>8.1f} ms")
+    # Time to first useful response: process start until the first read endpoint has answered
+    first_response_ms = statistics.median(sum(run.values()) for run in responses)
+    print(f"{'to first read':<32} {first_response_ms:>8.1f} ms")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import took {import_ms:.0f} ms, budget {args.import_budget_ms:.0f} ms")
+    if first_response_ms > args.first_response_budget_ms:
+        failures.append(f"first responses took {first_response_ms:.0f} ms, budget {args.first_response_budget_ms:.0f} ms")
+    if loaded:
+        failures.append(f"importing the app loaded {', '.join(sorted(loaded))}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Load test the read endpoints with the sync (threadpool) and async database paths.
+
+Usage (from the repo root):
+    python scripts/load_test.py [--database-url sqlite:///./bench.db] [--requests 2000] [--concurrency 50]
+
+Without --database-url a throwaway SQLite file in a temp directory is seeded
+with --users users of --cards cards each. The API is started under uvicorn
+once with ASYNC_DB=0 and once with ASYNC_DB=1, and each run reports req/s and
+p50/p99 latency for /daily/ and /dashboard/.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def seed(users, cards):
+    from backend import crud, schemas
+    from backend.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for user_id in range(1, users + 1):
+            rows = crud.create_flashcards(
+                db, [schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}") for i in range(cards)], user_id
+            )
+            reviews = [schemas.ReviewBase(flashcard_id=row["id"], correct=random.random() < 0.7) for row in rows[: cards // 4]]
+            crud.create_reviews(db, user_id, reviews)
+    finally:
+        db.close()
+        engine.dispose()
+
+
+async def wait_ready(client, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/health")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def hammer(client, paths, total, concurrency):
+    latencies, errors = [], 0
+    queue = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+async def run(port, paths, total, concurrency):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        await wait_ready(client)
+        await hammer(client, paths, concurrency, concurrency)  # warm up connections and caches
+        return await hammer(client, paths, total, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+        seed(args.users, args.cards)
+
+    endpoints = {
+        "/daily/": [f"/daily/{u}" for u in range(1, args.users + 1)],
+        "/dashboard/": [f"/dashboard/{u}?lean=true" for u in range(1, args.users + 1)],
+    }
+    print(f"{'mode':<6} {'endpoint':<12} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}")
+    try:
+        for mode in ("sync", "async"):
+            env = dict(os.environ, ASYNC_DB="1" if mode == "async" else "0")
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(args.port), "--log-level", "warning"],
+                cwd=ROOT, env=env,
+            )
+            try:
+                for name, paths in endpoints.items():
+                    seconds, latencies, errors = asyncio.run(run(args.port, paths, args.requests, args.concurrency))
+                    p50 = statistics.median(latencies) * 1000
+                    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+                    print(f"{mode:<6} {name:<12} {args.requests / seconds:>8.0f} {p50:>9.1f} {p99:>9.1f} {errors:>7}")
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        if tmpdir:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Rebuild the per-user counters in user_stats from flashcards and reviews.
+
+Usage (from the repo root):
+    python scripts/recompute_stats.py [--user-id 1 --user-id 2]
+
+Without --user-id every user is recomputed. Uses DATABASE_URL like the app.
+Run it after importing data outside the API, or if the counters drift.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import crud  # noqa: E402
+from backend.database import SessionLocal  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, action="append", dest="user_ids")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        count = crud.recompute_user_stats(db, args.user_ids)
+        print(f"Recomputed stats for {count} users in {time.perf_counter() - start:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
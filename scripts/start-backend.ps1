@@ -6,4 +6,6 @@ Write-Host "Starting FastAPI backend on port $Port..."
 $env:PYTHONUNBUFFERED = "1"
 $env:ENVIRONMENT = "development"
 
+python -m alembic upgrade head
+if ($LASTEXITCODE -ne 0) { exit $LASTEXITCODE }
 python -m uvicorn backend.main:app --host 127.0.0.1 --port $Port --reload
@@ -4,4 +4,5 @@ PORT=${1:-8000}
 export PYTHONUNBUFFERED=1
 export ENVIRONMENT=development
 
+python -m alembic upgrade head
 exec python -m uvicorn backend.main:app --host 127.0.0.1 --port "$PORT" --reload
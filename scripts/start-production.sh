@@ -0,0 +1,10 @@
+#!/usr/bin/env sh
+# Applies migrations once, then starts WEB_CONCURRENCY workers (default: one per CPU).
+# Set RUN_MIGRATIONS=0 when migrations run as a separate release step.
+set -eu
+
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+  alembic upgrade head
+fi
+
+exec gunicorn -c gunicorn.conf.py backend.main:app
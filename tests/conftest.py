@@ -0,0 +1,78 @@
+# tests/conftest.py
+import os
+import re
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+import pytest
+
+# The engine is created when backend.database is imported, so point it at a
+# throwaway database first
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+os.environ["LLM_CACHE_PATH"] = os.path.join(_tmpdir, "llm_cache.sqlite3")
+os.environ["ASYNC_DB"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from backend import crud, models, schemas  # noqa: E402
+from backend.database import Base, SessionLocal, engine  # noqa: E402
+from backend.main import app  # noqa: E402
+
+_TABLE = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE)\s+(\w+)", re.IGNORECASE)
+
+
+def tables(statement: str) -> set[str]:
+    return set(_TABLE.findall(statement))
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    # Not used as a context manager: the lifespan would start the ingest
+    # workers, whose polling would show up in the statement counts
+    return TestClient(app)
+
+
+@pytest.fixture
+def statements():
+    """Statements sent to the database while recording; clear() before the request under test."""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def add_cards(db, user_id: int, count: int = 5):
+    return crud.create_flashcards(
+        db, [schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}") for i in range(count)], user_id
+    )
+
+
+def add_holiday(db, user_id: int):
+    crud.set_holiday(db, user_id, date.today() - timedelta(days=1), date.today() + timedelta(days=2))
+
+
+def miss_days(db, user_id: int, days: int = 3):
+    """Backdates the user's reviews and cards so they have missed `days` days of study."""
+    past = datetime.utcnow() - timedelta(days=days)
+    db.query(models.Review).filter(models.Review.user_id == user_id).update({"timestamp": past})
+    db.query(models.Flashcard).filter(models.Flashcard.user_id == user_id).update(
+        {"next_due": past.date() + timedelta(days=1)}
+    )
+    db.commit()
@@ -0,0 +1,40 @@
+# tests/test_chunking.py
+import random
+
+import pytest
+
+from backend.utils.chunking import iter_chunks
+
+TEXT = (
+    'Alpha beta. "Gamma delta!" (Epsilon zeta?) eta").xxxxxxx gamma theta iota kappa. '
+    "Lambda mu nu xi omicron pi rho sigma tau upsilon phi chi psi omega and then some. "
+    "Short. Shorter! Tiny? A much longer sentence that keeps going well past any small budget we pick."
+)
+
+
+def _random_pieces(text, rng):
+    # Cut anywhere, including mid-word, and sprinkle in blank pieces
+    cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, 12)))
+    pieces = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+    for _ in range(rng.randint(0, 4)):
+        pieces.insert(rng.randint(0, len(pieces)), rng.choice(["", " ", "\n"]))
+    return pieces
+
+
+def test_blank_piece_after_a_pending_sentence():
+    # The blank piece used to add a space that pushed the sentence over budget
+    assert list(iter_chunks(['eta").xxxxxxx gamma', ""], 5, "tokens")) == ['eta").xxxxxxx gamma']
+    assert list(iter_chunks(['eta").xxxxxxx gamma', " ", "\n"], 5, "tokens")) == ['eta").xxxxxxx gamma']
+
+
+# Without the final full stop the last sentence is still pending when the stream ends
+@pytest.mark.parametrize("text", [TEXT, TEXT[:-1]])
+@pytest.mark.parametrize("unit", ["chars", "words", "tokens"])
+@pytest.mark.parametrize("overlap", [0, 2])
+def test_streamed_pieces_chunk_like_the_whole_text(text, unit, overlap):
+    rng = random.Random(f"{text[-1]}-{unit}-{overlap}")
+    for budget in (5, 8, 20, 60):
+        for _ in range(200):
+            pieces = _random_pieces(text, rng)
+            whole = list(iter_chunks([" ".join(pieces).strip()], budget, unit, overlap))
+            assert list(iter_chunks(pieces, budget, unit, overlap)) == whole, pieces
@@ -0,0 +1,59 @@
+# tests/test_daily_queries.py
+from collections import Counter
+
+import pytest
+
+from backend import crud, schemas
+
+from conftest import add_cards, add_holiday, miss_days, tables
+
+
+def _reads_per_table(statements):
+    return Counter(table for s in statements if s.lstrip().upper().startswith("SELECT") for table in tables(s))
+
+
+def _writes(statements):
+    return {table for s in statements if not s.lstrip().upper().startswith("SELECT") for table in tables(s)}
+
+
+def _setup(db, user_id, holiday, catchup):
+    cards = add_cards(db, user_id, 10)
+    crud.create_reviews(db, user_id, [schemas.ReviewBase(flashcard_id=c["id"], correct=True) for c in cards[:3]])
+    if catchup:
+        miss_days(db, user_id)
+    if holiday:
+        add_holiday(db, user_id)
+
+
+CASES = [
+    pytest.param(False, False, id="plain"),
+    pytest.param(True, False, id="holiday"),
+    pytest.param(False, True, id="catchup"),
+    pytest.param(True, True, id="catchup-on-holiday"),
+]
+
+
+@pytest.mark.parametrize("holiday, catchup", CASES)
+def test_daily_hits_each_table_once(db, client, statements, holiday, catchup):
+    _setup(db, 1, holiday, catchup)
+    # The first request builds and stores the queue, the second serves the stored one
+    for _ in range(2):
+        statements.clear()
+        body = client.get("/daily/1").json()
+        assert max(_reads_per_table(statements).values()) == 1, statements
+        assert _writes(statements) <= {"daily_queues"}
+
+    # Catch-up only applies after missed days and never during a holiday
+    assert body["missed_days"] is (catchup and not holiday)
+    assert bool(body["catchup"]) is (catchup and not holiday)
+
+
+@pytest.mark.parametrize("holiday, catchup", CASES)
+def test_dashboard_hits_each_table_once(db, client, statements, holiday, catchup):
+    _setup(db, 1, holiday, catchup)
+    for params in ({"lean": True}, {}):
+        statements.clear()
+        body = client.get("/dashboard/1", params=params).json()
+        assert max(_reads_per_table(statements).values()) == 1, statements
+        assert not _writes(statements)
+        assert (body["holiday"] is not None) is holiday
@@ -0,0 +1,55 @@
+# tests/test_dashboard_queries.py
+from backend import crud, schemas
+
+from conftest import add_cards, add_holiday
+
+
+def _review_some(db, user_id):
+    cards = add_cards(db, user_id)
+    crud.create_reviews(db, user_id, [schemas.ReviewBase(flashcard_id=c["id"], correct=True) for c in cards[:2]])
+
+
+def test_lean_dashboard_is_one_query(db, client, statements):
+    _review_some(db, 1)
+    statements.clear()
+    body = client.get("/dashboard/1", params={"lean": True}).json()
+    assert len(statements) == 1
+    assert "history" not in body
+    assert body["stats"]["total_reviews"] == 2
+    assert body["streak_status"] == "active"
+
+
+def test_full_dashboard_is_two_queries(db, client, statements):
+    _review_some(db, 1)
+    statements.clear()
+    body = client.get("/dashboard/1").json()
+    assert len(statements) == 2
+    assert len(body["history"]) == 2
+
+
+def test_user_without_stats_row(db, client, statements):
+    statements.clear()
+    lean = client.get("/dashboard/42", params={"lean": True}).json()
+    assert len(statements) == 1
+    statements.clear()
+    full = client.get("/dashboard/42").json()
+    assert len(statements) == 2
+    for body in (lean, full):
+        assert body["mastered"] == 0
+        assert body["streak"] == 0
+        assert body["holiday"] is None
+    assert full["history"] == []
+
+
+def test_user_on_holiday(db, client, statements):
+    _review_some(db, 1)
+    add_holiday(db, 1)
+    statements.clear()
+    lean = client.get("/dashboard/1", params={"lean": True}).json()
+    assert len(statements) == 1
+    statements.clear()
+    full = client.get("/dashboard/1").json()
+    assert len(statements) == 2
+    for body in (lean, full):
+        assert body["streak_status"] == "frozen"
+        assert body["holiday"]["days_left"] == 3
@@ -0,0 +1,39 @@
+# tests/test_ingest_jobs.py
+import asyncio
+import hashlib
+
+from backend import crud, models
+from backend.utils import flashcards as flashcard_service
+
+CONTENTS = b"three chunks of notes"
+CHUNKS = [[{"question": f"Q{i}", "answer": f"A{i}"}] for i in range(3)]
+
+
+async def _run(db, job, stop_after=None):
+    pipeline = flashcard_service.iter_process_file(
+        job.filename, CONTENTS, job.user_id, db, skip=job.chunks_done, job_id=job.id
+    )
+    try:
+        async for done, _, _ in pipeline:
+            if done == stop_after:
+                break  # the process dies here, after the chunk was saved
+    finally:
+        await pipeline.aclose()
+
+
+def test_resumed_job_does_not_repeat_saved_chunks(db):
+    # A finished earlier ingest of the same bytes, so no LLM calls are needed
+    crud.store_ingest_cache(
+        db, hashlib.sha256(CONTENTS).hexdigest(), "", CHUNKS, flashcard_service.GENERATION_KEY
+    )
+    job = crud.create_ingest_job(db, 1, "notes.txt", "unused")
+
+    asyncio.run(_run(db, job, stop_after=1))
+    db.refresh(job)
+    assert (job.chunks_done, job.cards_created) == (1, 1)
+    assert db.query(models.Flashcard).count() == 1
+
+    asyncio.run(_run(db, job))
+    db.refresh(job)
+    assert (job.chunks_done, job.cards_created) == (3, 3)
+    assert sorted(q for q, in db.query(models.Flashcard.question)) == ["Q0", "Q1", "Q2"]
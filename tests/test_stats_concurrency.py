@@ -0,0 +1,90 @@
+# tests/test_stats_concurrency.py
+import threading
+
+from sqlalchemy import func
+
+from backend import crud, models, schemas
+from backend.database import SessionLocal
+
+from conftest import add_cards
+
+THREADS, REVIEWS_PER_THREAD = 8, 25
+
+
+def _run_concurrently(work):
+    errors = []
+
+    def run(i):
+        db = SessionLocal()
+        try:
+            work(db, i)
+        except Exception as e:  # surfaced below, a thread can't fail the test itself
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors, errors
+
+
+def _assert_stats_match_rows(db, user_id, boxes=True):
+    db.expire_all()
+    stats = db.get(models.UserStats, user_id)
+    reviews = db.query(func.count(models.Review.id), func.sum(models.Review.correct)).filter(
+        models.Review.user_id == user_id
+    ).one()
+    counts = dict(db.query(models.Flashcard.box, func.count()).filter(
+        models.Flashcard.user_id == user_id
+    ).group_by(models.Flashcard.box).all())
+    assert (stats.total_reviews, stats.correct_reviews) == (reviews[0], reviews[1])
+    if boxes:
+        assert (stats.box1_cards, stats.box2_cards, stats.box3_cards) == tuple(counts.get(b, 0) for b in (1, 2, 3))
+
+
+def test_concurrent_reviews_keep_counters_exact(db):
+    # Cards are created without a stats row, so the first writers also race to create it
+    cards = add_cards(db, 1, THREADS)
+    db.query(models.UserStats).delete()
+    db.commit()
+
+    def review(session, i):
+        for n in range(REVIEWS_PER_THREAD):
+            crud.create_review(session, schemas.ReviewCreate(
+                user_id=1, flashcard_id=cards[i]["id"], correct=n % 3 != 0
+            ))
+
+    _run_concurrently(review)
+    assert db.query(models.Review).count() == THREADS * REVIEWS_PER_THREAD
+    # The recreated row starts its box counts at zero, so only the review totals are comparable
+    _assert_stats_match_rows(db, 1, boxes=False)
+
+
+def test_concurrent_batches_and_uploads_keep_counters_exact(db):
+    cards = add_cards(db, 2, THREADS)
+
+    def work(session, i):
+        for n in range(5):
+            if i % 2:
+                add_cards(session, 2, 3)
+            else:
+                crud.create_reviews(session, 2, [
+                    schemas.ReviewBase(flashcard_id=c["id"], correct=(n + j) % 2 == 0)
+                    for j, c in enumerate(cards)
+                ])
+
+    _run_concurrently(work)
+    _assert_stats_match_rows(db, 2)
+
+
+def test_concurrent_ingest_cache_writes_share_one_row(db):
+    # Simultaneous uploads of the same bytes both find no entry and insert it
+    def store(session, i):
+        for n in range(REVIEWS_PER_THREAD):
+            crud.store_ingest_cache(session, f"hash-{n}", f"text from upload {i}")
+
+    _run_concurrently(store)
+    assert db.query(models.IngestCache).count() == REVIEWS_PER_THREAD